@@ -25,6 +25,7 @@ from src.agents.analyst.anomaly import (
     detect_unusual_patterns,
     detect_all_anomalies,
 )
+from src.agents.analyst.columns import InvoiceColumns
 
 __all__ = [
     "AnalystAgent",
@@ -48,4 +49,5 @@ __all__ = [
     "detect_tax_anomalies",
     "detect_unusual_patterns",
     "detect_all_anomalies",
+    "InvoiceColumns",
 ]
@@ -0,0 +1,194 @@
+"""
+Numba-compiled numeric kernels for the analyst modules.
+
+Inputs are contiguous float64/int64 arrays built by the Python wrappers in
+anomaly.py and trends.py. Missing values are encoded as NaN, so fastmath is restricted to
+flags that keep NaN/inf semantics intact.
+"""
+import numpy as np
+from numba import njit
+
+# All fastmath flags except "nnan"/"ninf": the kernels rely on NaN checks.
+_FASTMATH = {"nsz", "arcp", "contract", "afn", "reassoc"}
+
+
+@njit(cache=True, nogil=True, fastmath=_FASTMATH)
+def _price_spike_kernel(totals, vidx, n_vendors, thresh):
+    """
+    Flag totals that exceed their vendor average by at least thresh percent.
+
+    Args:
+        totals: float64 invoice totals
+        vidx: int64 vendor index per total
+        n_vendors: Number of distinct vendors
+        thresh: Percentage above average to flag
+
+    Returns:
+        Tuple of (flags, percent above average, vendor average) per row
+    """
+    n = len(totals)
+    sums = np.zeros(n_vendors)
+    counts = np.zeros(n_vendors, dtype=np.int64)
+    for i in range(n):
+        sums[vidx[i]] += totals[i]
+        counts[vidx[i]] += 1
+
+    flags = np.zeros(n, dtype=np.bool_)
+    pcts = np.zeros(n)
+    avgs = np.zeros(n)
+    for i in range(n):
+        v = vidx[i]
+        avg = sums[v] / counts[v]
+        avgs[i] = avg
+        if counts[v] >= 2 and avg > 0:
+            pct = (totals[i] - avg) * 100.0 / avg
+            pcts[i] = pct
+            flags[i] = pct >= thresh
+
+    return flags, pcts, avgs
+
+
+@njit(cache=True, nogil=True, fastmath=_FASTMATH)
+def _tax_kernel(subtotal, tax, total, tax_rate):
+    """
+    Check stated totals and tax amounts against subtotal and tax rate.
+
+    Rows missing (NaN or zero) subtotal, tax or total are skipped; the
+    tax-rate check additionally requires a tax rate.
+
+    Args:
+        subtotal: float64 subtotals
+        tax: float64 tax amounts
+        total: float64 stated totals
+        tax_rate: float64 tax rates
+
+    Returns:
+        Tuple of (total mismatch flags, rate mismatch flags,
+        total differences, tax differences) per row
+    """
+    n = len(total)
+    flag1 = np.zeros(n, dtype=np.bool_)
+    flag2 = np.zeros(n, dtype=np.bool_)
+    diff1 = np.zeros(n)
+    diff2 = np.zeros(n)
+    for i in range(n):
+        s = subtotal[i]
+        t = tax[i]
+        tot = total[i]
+        if np.isnan(s) or np.isnan(t) or np.isnan(tot) or s == 0 or t == 0 or tot == 0:
+            continue
+
+        d1 = abs(tot - (s + t))
+        diff1[i] = d1
+        flag1[i] = d1 > 0.01
+
+        r = tax_rate[i]
+        if not np.isnan(r) and r != 0:
+            d2 = abs(t - s * r)
+            diff2[i] = d2
+            flag2[i] = d2 > 0.01
+
+    return flag1, flag2, diff1, diff2
+
+
+@njit(cache=True, nogil=True, fastmath=_FASTMATH)
+def _forecast_linear_kernel(values):
+    """
+    Extrapolate a least-squares line through values one step past the end.
+
+    Args:
+        values: float64 series (at least two points)
+
+    Returns:
+        Forecast for index len(values)
+    """
+    n = len(values)
+    x_mean = (n - 1) / 2.0
+    y_mean = values.sum() / n
+
+    numerator = 0.0
+    denominator = 0.0
+    for i in range(n):
+        dx = i - x_mean
+        numerator += dx * (values[i] - y_mean)
+        denominator += dx * dx
+
+    if denominator == 0:
+        return values[n - 1]
+
+    slope = numerator / denominator
+    intercept = y_mean - slope * x_mean
+
+    return slope * n + intercept
+
+
+@njit(cache=True, nogil=True, fastmath=_FASTMATH)
+def _month_bucket_kernel(ordinals, month_keys, totals):
+    """
+    Filter, bucket and sum dated invoice totals by month in two fused passes.
+
+    Rows need a date (ordinal > 0) and a non-missing, non-zero total. The
+    first pass finds the month and date range, the second sums each month
+    into a dense array offset from the earliest month.
+
+    Args:
+        ordinals: int64 date ordinals (0 for missing)
+        month_keys: int64 months since 1970-01 per row
+        totals: float64 invoice totals
+
+    Returns:
+        Tuple of (first month key, per-month sums, per-month counts,
+        total of all rows, row count, earliest ordinal, latest ordinal)
+    """
+    n = len(totals)
+    count = 0
+    total = 0.0
+    lo_key = 0
+    hi_key = 0
+    lo_ord = 0
+    hi_ord = 0
+    for i in range(n):
+        t = totals[i]
+        if ordinals[i] <= 0 or np.isnan(t) or t == 0:
+            continue
+        k = month_keys[i]
+        o = ordinals[i]
+        if count == 0:
+            lo_key = hi_key = k
+            lo_ord = hi_ord = o
+        else:
+            lo_key = min(lo_key, k)
+            hi_key = max(hi_key, k)
+            lo_ord = min(lo_ord, o)
+            hi_ord = max(hi_ord, o)
+        count += 1
+        total += t
+
+    span = hi_key - lo_key + 1 if count else 0
+    sums = np.zeros(span)
+    counts = np.zeros(span, dtype=np.int64)
+    if count:
+        for i in range(n):
+            t = totals[i]
+            if ordinals[i] <= 0 or np.isnan(t) or t == 0:
+                continue
+            k = month_keys[i] - lo_key
+            sums[k] += t
+            counts[k] += 1
+
+    return lo_key, sums, counts, total, count, lo_ord, hi_ord
+
+
+def warmup() -> None:
+    """
+    Compile (or load from the on-disk cache) every kernel ahead of traffic.
+
+    Called at process startup so the first analysis request does not pay
+    JIT latency. Running it during the image build persists the compiled
+    code in __pycache__, so containers only load it.
+    """
+    totals = np.ones(2)
+    _price_spike_kernel(totals, np.zeros(2, dtype=np.int64), 1, 50.0)
+    _tax_kernel(totals, totals, totals, totals)
+    _forecast_linear_kernel(totals)
+    _month_bucket_kernel(np.ones(2, dtype=np.int64), np.zeros(2, dtype=np.int64), totals)
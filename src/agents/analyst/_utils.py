@@ -0,0 +1,83 @@
+"""
+Shared helpers for the analyst modules.
+"""
+from typing import List, Dict, Any
+
+import numpy as np
+
+
+def _to_float(value: Any) -> float:
+    """
+    Coerce a scalar extraction value (float, int, numeric string, Decimal) to float.
+
+    Floats are returned as-is via an exact type check; everything else goes
+    through float(), which covers strings and Decimal without hasattr probing.
+    """
+    return value if type(value) is float else float(value)
+
+
+def _coerce_column(invoices: List[Dict[str, Any]], field: str) -> np.ndarray:
+    """
+    Coerce a numeric invoice field to a float64 array in a single pass.
+
+    Args:
+        invoices: List of invoice extractions
+        field: Field name to extract
+
+    Returns:
+        Array aligned with invoices; missing values are NaN
+    """
+    # fromiter converts floats, ints, numeric strings and Decimal itself, so
+    # only the None -> NaN substitution runs per value in Python.
+    return np.fromiter(
+        (np.nan if value is None else value for value in (inv.get(field) for inv in invoices)),
+        dtype=np.float64,
+        count=len(invoices),
+    )
+
+
+def _present(values: np.ndarray) -> np.ndarray:
+    """Mask of values that are neither missing (NaN) nor zero."""
+    return ~np.isnan(values) & (values != 0)
+
+
+def _vendor_spans(columns: Any) -> Dict[int, List[Any]]:
+    """
+    Track each vendor's earliest and latest dated invoice in one pass.
+
+    Only rows with both a date and a total are considered. Ties on date keep
+    the first row as earliest and the last row as latest, matching a stable
+    sort by date.
+
+    Args:
+        columns: InvoiceColumns to scan
+
+    Returns:
+        Mapping of vendor index to
+        [first_date, first_total, last_date, last_total, total, count],
+        in first-seen order
+    """
+    spans: Dict[int, List[Any]] = {}
+
+    rows = np.flatnonzero(columns.has_date & columns.has_total)
+
+    for vendor, inv_date, total in zip(
+        columns.vendor_idx[rows].tolist(),
+        columns.date_ordinal[rows].tolist(),
+        columns.total[rows].tolist(),
+    ):
+        entry = spans.get(vendor)
+        if entry is None:
+            spans[vendor] = [inv_date, total, inv_date, total, total, 1]
+            continue
+
+        if inv_date < entry[0]:
+            entry[0] = inv_date
+            entry[1] = total
+        if inv_date >= entry[2]:
+            entry[2] = inv_date
+            entry[3] = total
+        entry[4] += total
+        entry[5] += 1
+
+    return spans
@@ -1,7 +1,10 @@
 """
 Analyst agent for cross-document analysis.
 """
-from typing import List, Dict, Any, Optional
+import copy
+from collections import OrderedDict
+from typing import AbstractSet, List, Dict, Any, Optional, Tuple
+from src.agents.analyst.columns import InvoiceColumns
 from src.agents.analyst.comparison import (
     ComparisonResult,
     compare_invoices,
@@ -21,6 +24,7 @@ from src.agents.analyst.metrics import (
     calculate_vendor_metrics,
     calculate_monthly_metrics,
     calculate_summary_statistics,
+    SUMMARY_SECTIONS,
 )
 
 
@@ -33,6 +37,8 @@ class AnalystAgent:
     - Generating insights
     """
 
+    cache_size = 32
+
     def __init__(self):
         self.comparison = compare_invoices
         self.vendor_pricing = compare_vendor_pricing
@@ -41,34 +47,72 @@ class AnalystAgent:
         self.vendor_trends = analyze_vendor_trends
         self.metrics = calculate_invoice_metrics
         self.summary = calculate_summary_statistics
+        self._cache: "OrderedDict[Tuple[frozenset, str, frozenset], Dict[str, Any]]" = OrderedDict()
 
     def analyze(
         self,
         documents: List[Dict[str, Any]],
         analysis_type: str = "comparison",
+        include: AbstractSet[str] = SUMMARY_SECTIONS,
     ) -> Dict[str, Any]:
         """
         Perform analysis on documents.
 
+        Results are cached per (document id set, analysis type, sections) so
+        repeated requests for the same documents skip recomputation. Each
+        call gets its own copy, so callers may mutate the result. Call
+        clear_cache() if the underlying extractions change.
+
         Args:
             documents: List of document extractions
             analysis_type: Type of analysis to perform
+            include: Summary sections to compute for "metrics" analysis
 
         Returns:
             Analysis results
         """
+        doc_ids = [doc.get("document_id") for doc in documents]
+        key = None
+        if doc_ids and None not in doc_ids:
+            key = (frozenset(doc_ids), analysis_type, frozenset(include))
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return copy.deepcopy(self._cache[key])
+
+        result = self._run_analysis(documents, analysis_type, include)
+
+        if key is not None and "error" not in result:
+            self._cache[key] = copy.deepcopy(result)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return result
+
+    def clear_cache(self) -> None:
+        """Drop cached analysis results, e.g. after extractions are edited."""
+        self._cache.clear()
+
+    def _run_analysis(
+        self,
+        documents: List[Dict[str, Any]],
+        analysis_type: str,
+        include: AbstractSet[str],
+    ) -> Dict[str, Any]:
+        """Compute analysis results without consulting the cache."""
         if analysis_type == "comparison":
+            columns = InvoiceColumns.from_dicts(documents)
             return {
-                "comparison": self.comparison(documents).__dict__,
-                "pricing_trends": self.trends(documents),
+                "comparison": self.comparison(documents, columns=columns).to_dict(),
+                "pricing_trends": self.trends(documents, columns=columns),
             }
         elif analysis_type == "trend":
+            columns = InvoiceColumns.from_dicts(documents)
             return {
-                "spending_trends": self.spending_trends(documents).__dict__,
-                "vendor_trends": self.vendor_trends(documents),
+                "spending_trends": self.spending_trends(documents, columns=columns).to_dict(),
+                "vendor_trends": self.vendor_trends(documents, columns=columns),
             }
         elif analysis_type == "metrics":
-            return self.summary(documents)
+            return self.summary(documents, columns=InvoiceColumns.from_dicts(documents), include=include)
         else:
             return {"error": f"Unknown analysis type: {analysis_type}"}
 
@@ -1,30 +1,38 @@
 """
 Anomaly detection for document analysis.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
+
+import numpy as np
+
 from src.api.models.analysis import AnomalyType, Severity
+from src.agents.analyst._kernels import _price_spike_kernel, _tax_kernel
+from src.agents.analyst.columns import InvoiceColumns
+
+# Bound once at import so detector loops avoid repeated enum attribute lookups
+_PRICE_SPIKE = AnomalyType.PRICE_SPIKE
+_DUPLICATE = AnomalyType.DUPLICATE_CHARGE
+_TAX = AnomalyType.TAX_ANOMALY
+_PATTERN = AnomalyType.UNUSUAL_PATTERN
+_INFO = Severity.INFO
+_WARNING = Severity.WARNING
+_CRITICAL = Severity.CRITICAL
 
 
+@dataclass(slots=True)
 class Anomaly:
     """Detected anomaly in document analysis."""
 
-    def __init__(
-        self,
-        anomaly_type: AnomalyType,
-        severity: Severity,
-        description: str,
-        document_ids: List[str],
-        details: Dict[str, Any],
-        recommendation: Optional[str] = None,
-    ):
-        self.anomaly_type = anomaly_type
-        self.severity = severity
-        self.description = description
-        self.document_ids = document_ids
-        self.details = details
-        self.recommendation = recommendation
+    anomaly_type: AnomalyType
+    severity: Severity
+    description: str
+    document_ids: List[str]
+    details: Dict[str, Any]
+    recommendation: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -38,7 +46,9 @@ class Anomaly:
 
 
 def detect_price_spikes(
-    invoices: List[Dict[str, Any]], threshold_percent: float = 50.0
+    invoices: List[Dict[str, Any]],
+    threshold_percent: float = 50.0,
+    columns: Optional[InvoiceColumns] = None,
 ) -> List[Anomaly]:
     """
     Detect unusual price spikes compared to vendor average.
@@ -46,113 +56,84 @@ def detect_price_spikes(
     Args:
         invoices: List of invoice extractions
         threshold_percent: Percentage above average to flag as spike
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         List of detected price spike anomalies
     """
-    vendor_totals: Dict[str, List[float]] = {}
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-    for inv in invoices:
-        vendor = inv.get("vendor_name", "Unknown")
-        total = inv.get("total")
+    rows = np.flatnonzero(columns.has_vendor & columns.has_total)
+    if not rows.size:
+        return []
 
-        if total and vendor:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-
-            if vendor not in vendor_totals:
-                vendor_totals[vendor] = []
-            vendor_totals[vendor].append(total)
+    # Vendor indices are shared with the full batch; the kernel groups in one pass
+    totals = columns.total[rows]
+    vidx = columns.vendor_idx[rows]
+    flagged, pct, row_avg = _price_spike_kernel(
+        totals, vidx, len(columns.vendor_names), float(threshold_percent)
+    )
 
     anomalies = []
-
-    for vendor, totals in vendor_totals.items():
-        if len(totals) < 2:
-            continue
-
-        avg_total = sum(totals) / len(totals)
-
-        for i, inv in enumerate(invoices):
-            if inv.get("vendor_name") == vendor:
-                total = inv.get("total")
-                if total:
-                    if isinstance(total, str):
-                        total = float(total)
-                    elif hasattr(total, "float_value"):
-                        total = float(total)
-
-                    if avg_total > 0:
-                        pct_above = ((total - avg_total) / avg_total) * 100
-
-                        if pct_above >= threshold_percent:
-                            doc_id = inv.get("document_id", f"doc_{i}")
-                            anomalies.append(Anomaly(
-                                anomaly_type=AnomalyType.PRICE_SPIKE,
-                                severity=Severity.WARNING,
-                                description=f"Price {pct_above:.1f}% above vendor average",
-                                document_ids=[doc_id],
-                                details={
-                                    "vendor": vendor,
-                                    "invoice_total": total,
-                                    "vendor_average": avg_total,
-                                    "percent_above": pct_above,
-                                },
-                                recommendation=f"Review invoice for {vendor} - significantly higher than average",
-                            ))
+    for r in np.flatnonzero(flagged):
+        vendor = columns.vendor_names[vidx[r]]
+        total = float(totals[r])
+        avg_total = float(row_avg[r])
+        pct_above = float(pct[r])
+        anomalies.append(Anomaly(
+            anomaly_type=_PRICE_SPIKE,
+            severity=_WARNING,
+            description=f"Price {pct_above:.1f}% above vendor average",
+            document_ids=[columns.doc_ids[rows[r]]],
+            details={
+                "vendor": vendor,
+                "invoice_total": total,
+                "vendor_average": avg_total,
+                "percent_above": pct_above,
+            },
+            recommendation=f"Review invoice for {vendor} - significantly higher than average",
+        ))
 
     return anomalies
 
 
-def detect_duplicate_charges(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
+def detect_duplicate_charges(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> List[Anomaly]:
     """
     Detect potential duplicate charges based on vendor, amount, and date.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         List of detected duplicate charge anomalies
     """
-    duplicates = []
-    seen: Dict[str, List[int]] = {}
-
-    for i, inv in enumerate(invoices):
-        vendor = inv.get("vendor_name", "")
-        total = inv.get("total")
-        inv_date = inv.get("invoice_date")
-
-        if not (vendor and total and inv_date):
-            continue
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-        if isinstance(total, str):
-            total = float(total)
-        elif hasattr(total, "float_value"):
-            total = float(total)
+    duplicates = []
+    seen: Dict[Tuple[int, float], List[int]] = {}
 
-        key = f"{vendor}|{total}"
+    rows = np.flatnonzero(columns.has_vendor & columns.has_total & columns.has_date)
+    for i, vidx, total in zip(rows.tolist(), columns.vendor_idx[rows].tolist(), columns.total[rows].tolist()):
+        key = (vidx, total)
         if key not in seen:
             seen[key] = []
         seen[key].append(i)
 
-    for key, indices in seen.items():
+    for (vidx, total), indices in seen.items():
         if len(indices) < 2:
             continue
 
-        doc_ids = []
-        for idx in indices:
-            doc_id = invoices[idx].get("document_id", f"doc_{idx}")
-            doc_ids.append(doc_id)
-
-        vendor = key.split("|")[0]
-        total = float(key.split("|")[1])
-
+        vendor = columns.vendor_names[vidx]
         duplicates.append(Anomaly(
-            anomaly_type=AnomalyType.DUPLICATE_CHARGE,
-            severity=Severity.CRITICAL,
+            anomaly_type=_DUPLICATE,
+            severity=_CRITICAL,
             description=f"Potential duplicate charges from {vendor}",
-            document_ids=doc_ids,
+            document_ids=[columns.doc_ids[idx] for idx in indices],
             details={
                 "vendor": vendor,
                 "amount": total,
@@ -164,108 +145,91 @@ def detect_duplicate_charges(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
     return duplicates
 
 
-def detect_tax_anomalies(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
+def detect_tax_anomalies(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> List[Anomaly]:
     """
     Detect tax calculation anomalies.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         List of detected tax anomalies
     """
-    anomalies = []
-
-    for i, inv in enumerate(invoices):
-        subtotal = inv.get("subtotal")
-        tax = inv.get("tax")
-        tax_rate = inv.get("tax_rate")
-        total = inv.get("total")
-
-        if not (subtotal and tax and total):
-            continue
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-        if isinstance(subtotal, str):
-            subtotal = float(subtotal)
-        elif hasattr(subtotal, "float_value"):
-            subtotal = float(subtotal)
+    subtotal = columns.subtotal
+    tax = columns.tax
+    total = columns.total
+    tax_rate = columns.tax_rate
+    total_mismatch, rate_mismatch, total_diff, tax_diff = _tax_kernel(subtotal, tax, total, tax_rate)
 
-        if isinstance(tax, str):
-            tax = float(tax)
-        elif hasattr(tax, "float_value"):
-            tax = float(tax)
-
-        if isinstance(total, str):
-            total = float(total)
-        elif hasattr(total, "float_value"):
-            total = float(total)
+    anomalies = []
 
-        calculated_total = subtotal + tax
-        total_diff = abs(total - calculated_total)
+    for i in np.flatnonzero(total_mismatch | rate_mismatch):
+        doc_id = columns.doc_ids[i]
 
-        if total_diff > 0.01:
-            doc_id = inv.get("document_id", f"doc_{i}")
+        if total_mismatch[i]:
             anomalies.append(Anomaly(
-                anomaly_type=AnomalyType.TAX_ANOMALY,
-                severity=Severity.WARNING,
+                anomaly_type=_TAX,
+                severity=_WARNING,
                 description="Tax calculation does not match total",
                 document_ids=[doc_id],
                 details={
-                    "subtotal": subtotal,
-                    "tax": tax,
-                    "stated_total": total,
-                    "calculated_total": calculated_total,
-                    "difference": total_diff,
+                    "subtotal": float(subtotal[i]),
+                    "tax": float(tax[i]),
+                    "stated_total": float(total[i]),
+                    "calculated_total": float(subtotal[i] + tax[i]),
+                    "difference": float(total_diff[i]),
                 },
                 recommendation="Verify tax calculation and total",
             ))
 
-        if tax_rate:
-            if isinstance(tax_rate, str):
-                tax_rate = float(tax_rate)
-            elif hasattr(tax_rate, "float_value"):
-                tax_rate = float(tax_rate)
-
-            expected_tax = subtotal * tax_rate
-            tax_diff = abs(tax - expected_tax)
-
-            if tax_diff > 0.01:
-                doc_id = inv.get("document_id", f"doc_{i}")
-                anomalies.append(Anomaly(
-                    anomaly_type=AnomalyType.TAX_ANOMALY,
-                    severity=Severity.WARNING,
-                    description="Tax amount does not match tax rate",
-                    document_ids=[doc_id],
-                    details={
-                        "subtotal": subtotal,
-                        "tax_rate": tax_rate,
-                        "expected_tax": expected_tax,
-                        "actual_tax": tax,
-                        "difference": tax_diff,
-                    },
-                    recommendation="Verify tax rate application",
-                ))
+        if rate_mismatch[i]:
+            anomalies.append(Anomaly(
+                anomaly_type=_TAX,
+                severity=_WARNING,
+                description="Tax amount does not match tax rate",
+                document_ids=[doc_id],
+                details={
+                    "subtotal": float(subtotal[i]),
+                    "tax_rate": float(tax_rate[i]),
+                    "expected_tax": float(subtotal[i] * tax_rate[i]),
+                    "actual_tax": float(tax[i]),
+                    "difference": float(tax_diff[i]),
+                },
+                recommendation="Verify tax rate application",
+            ))
 
     return anomalies
 
 
-def detect_unusual_patterns(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
+def detect_unusual_patterns(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> List[Anomaly]:
     """
     Detect unusual patterns in invoices.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         List of detected pattern anomalies
     """
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    high_total = (columns.total > 100000).tolist()
     anomalies = []
 
     for i, inv in enumerate(invoices):
         issues = []
 
-        total = inv.get("total")
-        if total and total > 100000:
+        if high_total[i]:
             issues.append("Very high invoice total")
 
         line_items = inv.get("line_items", [])
@@ -276,12 +240,11 @@ def detect_unusual_patterns(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
             issues.append("Vendor name suspiciously short")
 
         if issues:
-            doc_id = inv.get("document_id", f"doc_{i}")
             anomalies.append(Anomaly(
-                anomaly_type=AnomalyType.UNUSUAL_PATTERN,
-                severity=Severity.INFO,
+                anomaly_type=_PATTERN,
+                severity=_INFO,
                 description=f"Unusual pattern detected: {'; '.join(issues)}",
-                document_ids=[doc_id],
+                document_ids=[columns.doc_ids[i]],
                 details={"issues": issues},
                 recommendation="Review for potential issues",
             ))
@@ -289,22 +252,37 @@ def detect_unusual_patterns(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
     return anomalies
 
 
-def detect_all_anomalies(invoices: List[Dict[str, Any]]) -> List[Anomaly]:
+def detect_all_anomalies(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> List[Anomaly]:
     """
     Run all anomaly detection methods.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Combined list of all detected anomalies
     """
-    all_anomalies = []
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    detectors = (
+        detect_price_spikes,
+        detect_duplicate_charges,
+        detect_tax_anomalies,
+        detect_unusual_patterns,
+    )
 
-    all_anomalies.extend(detect_price_spikes(invoices))
-    all_anomalies.extend(detect_duplicate_charges(invoices))
-    all_anomalies.extend(detect_tax_anomalies(invoices))
-    all_anomalies.extend(detect_unusual_patterns(invoices))
+    # Detectors only read the shared inputs; the compiled kernels release the GIL
+    with ThreadPoolExecutor(max_workers=len(detectors)) as executor:
+        futures = [executor.submit(fn, invoices, columns=columns) for fn in detectors]
+        results = [future.result() for future in futures]
+
+    all_anomalies = []
+    for anomalies in results:
+        all_anomalies.extend(anomalies)
 
     return all_anomalies
 
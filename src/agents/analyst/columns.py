@@ -0,0 +1,114 @@
+"""
+Columnar (structure-of-arrays) view of invoice extractions.
+"""
+from typing import List, Dict, Any
+from dataclasses import dataclass
+from datetime import date
+import sys
+
+import numpy as np
+
+from src.agents.analyst._utils import _coerce_column, _present
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _vendor_key(vendor: Any) -> Any:
+    """Vendor grouping key; names are interned so repeat vendors share one string."""
+    vendor = vendor or "Unknown"
+    return sys.intern(vendor) if type(vendor) is str else vendor
+
+
+def _date_ordinal(value: Any) -> int:
+    """Convert a date, datetime or ISO date string to an ordinal (0 if missing)."""
+    if not value:
+        return 0
+    if isinstance(value, date):
+        return value.toordinal()
+    try:
+        return date.fromisoformat(str(value)[:10]).toordinal()
+    except ValueError:
+        return 0
+
+
+@dataclass(slots=True)
+class InvoiceColumns:
+    """
+    Invoice fields as parallel arrays, built once per batch.
+
+    Numeric fields are float64 with NaN for missing values. Vendors are
+    stored as integer indices into vendor_names (first-seen order, with
+    missing names grouped as "Unknown"), and dates as proleptic Gregorian
+    ordinals with 0 for missing.
+    """
+
+    total: np.ndarray
+    subtotal: np.ndarray
+    tax: np.ndarray
+    tax_rate: np.ndarray
+    vendor_idx: np.ndarray
+    vendor_names: np.ndarray
+    has_vendor: np.ndarray
+    date_ordinal: np.ndarray
+    doc_ids: List[str]
+
+    @classmethod
+    def from_dicts(cls, invoices: List[Dict[str, Any]]) -> "InvoiceColumns":
+        """
+        Build columns from invoice extraction dictionaries.
+
+        Args:
+            invoices: List of invoice extractions
+
+        Returns:
+            InvoiceColumns aligned with invoices
+        """
+        n = len(invoices)
+
+        # Read vendor_name once per invoice; both the index and the has_vendor
+        # mask are derived from this list.
+        vendors = [inv.get("vendor_name") for inv in invoices]
+
+        vendor_index: Dict[Any, int] = {}
+        vendor_idx = np.fromiter(
+            (vendor_index.setdefault(_vendor_key(vendor), len(vendor_index)) for vendor in vendors),
+            dtype=np.int64,
+            count=n,
+        )
+        vendor_names = np.empty(len(vendor_index), dtype=object)
+        vendor_names[:] = list(vendor_index)
+
+        return cls(
+            total=_coerce_column(invoices, "total"),
+            subtotal=_coerce_column(invoices, "subtotal"),
+            tax=_coerce_column(invoices, "tax"),
+            tax_rate=_coerce_column(invoices, "tax_rate"),
+            vendor_idx=vendor_idx,
+            vendor_names=vendor_names,
+            has_vendor=np.fromiter(map(bool, vendors), dtype=bool, count=n),
+            date_ordinal=np.fromiter(
+                (_date_ordinal(inv.get("invoice_date")) for inv in invoices), dtype=np.int64, count=n
+            ),
+            doc_ids=[inv.get("document_id", f"doc_{i}") for i, inv in enumerate(invoices)],
+        )
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @property
+    def has_total(self) -> np.ndarray:
+        """Mask of rows with a non-zero total."""
+        return _present(self.total)
+
+    @property
+    def has_date(self) -> np.ndarray:
+        """Mask of rows with an invoice date."""
+        return self.date_ordinal > 0
+
+    @property
+    def months(self) -> np.ndarray:
+        """Invoice dates as datetime64[M]; only meaningful where has_date."""
+        return (self.date_ordinal - _EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[M]")
+
+
+__all__ = ["InvoiceColumns"]
@@ -1,35 +1,40 @@
 """
 Comparison engine for analyzing multiple documents.
 """
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
 
+import numpy as np
 
+from src.agents.analyst.columns import InvoiceColumns
+from src.agents.analyst._utils import _present, _to_float, _vendor_spans
+
+
+@dataclass(slots=True)
 class ComparisonResult:
     """Result of document comparison."""
 
-    def __init__(
-        self,
-        compared_documents: List[str],
-        similarities: Dict[str, float],
-        differences: Dict[str, Any],
-        shared_vendors: List[str],
-        price_variance: Optional[float] = None,
-    ):
-        self.compared_documents = compared_documents
-        self.similarities = similarities
-        self.differences = differences
-        self.shared_vendors = shared_vendors
-        self.price_variance = price_variance
-
-
-def compare_invoices(invoices: List[Dict[str, Any]]) -> ComparisonResult:
+    compared_documents: List[str]
+    similarities: Dict[str, float]
+    differences: Dict[str, Any]
+    shared_vendors: List[str]
+    price_variance: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def compare_invoices(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> ComparisonResult:
     """
     Compare multiple invoice extractions.
 
     Args:
         invoices: List of invoice extraction dictionaries
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         ComparisonResult with analysis
@@ -42,49 +47,40 @@ def compare_invoices(invoices: List[Dict[str, Any]]) -> ComparisonResult:
             shared_vendors=[],
         )
 
-    doc_ids = [inv.get("document_id", f"doc_{i}") for i, inv in enumerate(invoices)]
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-    vendors = [inv.get("vendor_name") for inv in invoices if inv.get("vendor_name")]
-    shared_vendors = list(set([v for v in vendors if vendors.count(v) > 1]))
+    vendor_counts = np.bincount(
+        columns.vendor_idx[columns.has_vendor], minlength=len(columns.vendor_names)
+    )
+    shared_vendors = columns.vendor_names[vendor_counts > 1].tolist()
 
-    totals = []
-    for inv in invoices:
-        total = inv.get("total")
-        if total is not None:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            totals.append(total)
+    present = columns.total[~np.isnan(columns.total)]
 
     price_variance = None
-    if len(totals) > 1:
-        avg_total = sum(totals) / len(totals)
-        max_diff = max(abs(t - avg_total) for t in totals)
+    if present.size > 1:
+        avg_total = float(present.mean())
+        max_diff = float(np.abs(present - avg_total).max())
         price_variance = (max_diff / avg_total * 100) if avg_total > 0 else 0
 
-    dates = []
-    for inv in invoices:
-        inv_date = inv.get("invoice_date")
-        if inv_date:
-            if isinstance(inv_date, str):
-                dates.append(inv_date)
-            else:
-                dates.append(str(inv_date))
+    dates = columns.date_ordinal[columns.has_date]
 
     similarities = {
-        "vendor_count": len(set(vendors)),
-        "date_range": f"{min(dates)} to {max(dates)}" if dates else "N/A",
+        "vendor_count": int(np.count_nonzero(vendor_counts)),
+        "date_range": (
+            f"{date.fromordinal(int(dates.min()))} to {date.fromordinal(int(dates.max()))}"
+            if dates.size else "N/A"
+        ),
     }
 
     differences = {
         "total_count": len(invoices),
-        "total_value": sum(totals) if totals else 0,
-        "average_value": sum(totals) / len(totals) if totals else 0,
+        "total_value": float(present.sum()) if present.size else 0,
+        "average_value": float(present.mean()) if present.size else 0,
     }
 
     return ComparisonResult(
-        compared_documents=doc_ids,
+        compared_documents=columns.doc_ids,
         similarities=similarities,
         differences=differences,
         shared_vendors=shared_vendors,
@@ -93,7 +89,9 @@ def compare_invoices(invoices: List[Dict[str, Any]]) -> ComparisonResult:
 
 
 def compare_vendor_pricing(
-    invoices: List[Dict[str, Any]], vendor_name: str
+    invoices: List[Dict[str, Any]],
+    vendor_name: str,
+    columns: Optional[InvoiceColumns] = None,
 ) -> Dict[str, Any]:
     """
     Compare pricing for a specific vendor across multiple invoices.
@@ -101,47 +99,42 @@ def compare_vendor_pricing(
     Args:
         invoices: List of invoice extractions
         vendor_name: Vendor to compare
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Pricing comparison data
     """
-    vendor_invoices = [
-        inv for inv in invoices if inv.get("vendor_name", "").lower() == vendor_name.lower()
-    ]
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    # Match against the distinct vendor names, then select the vendor's rows
+    # as an index array into the shared columns instead of copying dicts.
+    target = vendor_name.lower()
+    matches = [i for i, name in enumerate(columns.vendor_names.tolist()) if name.lower() == target]
+    rows = np.flatnonzero(np.isin(columns.vendor_idx, matches) & columns.has_vendor)
 
-    if not vendor_invoices:
+    if not rows.size:
         return {"error": f"No invoices found for vendor: {vendor_name}"}
 
-    prices = []
-    for inv in vendor_invoices:
-        total = inv.get("total")
-        if total:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            prices.append(total)
+    totals = columns.total[rows]
+    prices = totals[_present(totals)]
 
     line_item_prices = {}
-    for inv in vendor_invoices:
-        for item in inv.get("line_items", []):
+    for i in rows.tolist():
+        for item in invoices[i].get("line_items", []):
             desc = item.get("description", "unknown")
             if desc not in line_item_prices:
                 line_item_prices[desc] = []
             price = item.get("unit_price")
             if price:
-                if isinstance(price, str):
-                    price = float(price)
-                elif hasattr(price, "float_value"):
-                    price = float(price)
-                line_item_prices[desc].append(price)
+                line_item_prices[desc].append(_to_float(price))
 
     return {
         "vendor_name": vendor_name,
-        "invoice_count": len(vendor_invoices),
-        "total_spent": sum(prices),
-        "average_invoice": sum(prices) / len(prices) if prices else 0,
-        "price_range": {"min": min(prices), "max": max(prices)} if prices else None,
+        "invoice_count": int(rows.size),
+        "total_spent": float(prices.sum()),
+        "average_invoice": float(prices.mean()) if prices.size else 0,
+        "price_range": {"min": float(prices.min()), "max": float(prices.max())} if prices.size else None,
         "line_item_prices": {
             desc: {
                 "min": min(prices),
@@ -154,51 +147,40 @@ def compare_vendor_pricing(
     }
 
 
-def detect_pricing_trends(invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
+def detect_pricing_trends(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> Dict[str, Any]:
     """
     Detect pricing trends over time for vendors.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Trend analysis data
     """
-    dated_invoices = []
-    for inv in invoices:
-        inv_date = inv.get("invoice_date")
-        total = inv.get("total")
-        if inv_date and total:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            dated_invoices.append({"date": inv_date, "total": total, "vendor": inv.get("vendor_name")})
-
-    if not dated_invoices:
-        return {"error": "No dated invoices found"}
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-    dated_invoices.sort(key=lambda x: x["date"])
+    # Only the earliest and latest invoice per vendor matter, so track them in
+    # one pass instead of sorting and grouping every dated invoice.
+    spans = _vendor_spans(columns)
+    dated_count = sum(span[5] for span in spans.values())
 
-    vendors = {}
-    for inv in dated_invoices:
-        vendor = inv.get("vendor", "unknown")
-        if vendor not in vendors:
-            vendors[vendor] = []
-        vendors[vendor].append({"date": inv["date"], "total": inv["total"]})
+    if not dated_count:
+        return {"error": "No dated invoices found"}
 
     trends = {}
-    for vendor, items in vendors.items():
-        if len(items) < 2:
+    for vendor, (_, first_total, _, last_total, _, count) in spans.items():
+        if count < 2:
             continue
-        first_total = items[0]["total"]
-        last_total = items[-1]["total"]
         change_pct = ((last_total - first_total) / first_total * 100) if first_total > 0 else 0
-        trends[vendor] = {
-            "first_invoice": items[0]["total"],
-            "last_invoice": items[-1]["total"],
+        trends[columns.vendor_names[vendor]] = {
+            "first_invoice": first_total,
+            "last_invoice": last_total,
             "change_percent": change_pct,
             "trend": "increasing" if change_pct > 5 else "decreasing" if change_pct < -5 else "stable",
         }
 
-    return {"trends": trends, "dated_invoices": len(dated_invoices)}
+    return {"trends": trends, "dated_invoices": dated_count}
@@ -1,92 +1,60 @@
 """
 Metrics calculator for document analysis.
 """
-from typing import List, Dict, Any, Optional
+from typing import AbstractSet, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
 from datetime import date, datetime
 from decimal import Decimal
-import statistics
+import heapq
+import math
 
+import numpy as np
 
+from src.agents.analyst.columns import InvoiceColumns
+
+
+@dataclass(slots=True)
 class AnalysisMetrics:
     """Container for analysis metrics."""
 
-    def __init__(
-        self,
-        total_documents: int,
-        total_value: float,
-        average_value: float,
-        median_value: Optional[float] = None,
-        min_value: Optional[float] = None,
-        max_value: Optional[float] = None,
-        standard_deviation: Optional[float] = None,
-    ):
-        self.total_documents = total_documents
-        self.total_value = total_value
-        self.average_value = average_value
-        self.median_value = median_value
-        self.min_value = min_value
-        self.max_value = max_value
-        self.standard_deviation = standard_deviation
+    total_documents: int
+    total_value: float
+    average_value: float
+    median_value: Optional[float] = None
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    standard_deviation: Optional[float] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "total_documents": self.total_documents,
-            "total_value": self.total_value,
-            "average_value": self.average_value,
-            "median_value": self.median_value,
-            "min_value": self.min_value,
-            "max_value": self.max_value,
-            "standard_deviation": self.standard_deviation,
-        }
-
-
-def calculate_invoice_metrics(invoices: List[Dict[str, Any]]) -> AnalysisMetrics:
-    """
-    Calculate metrics from invoice extractions.
+        return {name: getattr(self, name) for name in self.__slots__}
 
-    Args:
-        invoices: List of invoice extraction dictionaries
 
-    Returns:
-        AnalysisMetrics with calculated values
-    """
-    if not invoices:
-        return AnalysisMetrics(
-            total_documents=0,
-            total_value=0.0,
-            average_value=0.0,
-        )
+def _metrics_from_totals(total_documents: int, totals: np.ndarray) -> AnalysisMetrics:
+    """Build AnalysisMetrics from a totals column (NaN for missing)."""
+    arr = totals[~np.isnan(totals)]
 
-    totals = []
-    for inv in invoices:
-        total = inv.get("total")
-        if total is not None:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            totals.append(total)
-
-    if not totals:
+    if not arr.size:
         return AnalysisMetrics(
-            total_documents=len(invoices),
+            total_documents=total_documents,
             total_value=0.0,
             average_value=0.0,
         )
 
-    total_value = sum(totals)
-    average_value = total_value / len(totals)
-
-    median_value = statistics.median(totals) if len(totals) > 1 else totals[0]
-    min_value = min(totals)
-    max_value = max(totals)
+    total_value = float(arr.sum())
+    average_value = total_value / arr.size
+    min_value = float(arr.min())
+    max_value = float(arr.max())
 
     std_dev = None
-    if len(totals) > 1:
-        std_dev = statistics.stdev(totals)
+    if arr.size > 1:
+        std_dev = float(arr.std(ddof=1))
+
+    # arr is already a private copy from the NaN mask, so let np.median
+    # partition it in place (O(N) introselect, no second copy). Must run last.
+    median_value = float(np.median(arr, overwrite_input=True))
 
     return AnalysisMetrics(
-        total_documents=len(invoices),
+        total_documents=total_documents,
         total_value=total_value,
         average_value=average_value,
         median_value=median_value,
@@ -96,56 +64,150 @@ def calculate_invoice_metrics(invoices: List[Dict[str, Any]]) -> AnalysisMetrics
     )
 
 
-def calculate_vendor_metrics(invoices: List[Dict[str, Any]]) -> Dict[str, AnalysisMetrics]:
+def _grouped_metrics(keys: np.ndarray, n_groups: int, totals: np.ndarray) -> List[AnalysisMetrics]:
+    """
+    Calculate AnalysisMetrics for every group in one vectorized sweep.
+
+    Rows are sorted by (group, total) so each group is a contiguous segment:
+    sums come from np.add.reduceat, min/max/median from segment offsets, and
+    the sample std from a second reduceat over squared deviations.
+
+    Args:
+        keys: Integer group key per row (0 <= key < n_groups)
+        n_groups: Number of groups
+        totals: Totals per row (NaN for missing)
+
+    Returns:
+        Metrics per group, indexed by key
+    """
+    doc_counts = np.bincount(keys, minlength=n_groups).tolist()
+
+    valid = ~np.isnan(totals)
+    group = keys[valid]
+    values = totals[valid]
+    order = np.lexsort((values, group))
+    group = group[order]
+    values = values[order]
+
+    counts = np.bincount(group, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+    seg_start = starts[has]
+    seg_count = counts[has]
+
+    stats: Dict[int, Tuple[float, float, float, float, float, Optional[float]]] = {}
+    if values.size:
+        sums = np.add.reduceat(values, seg_start)
+        means = sums / seg_count
+        mins = values[seg_start]
+        maxs = values[seg_start + seg_count - 1]
+        medians = (values[seg_start + (seg_count - 1) // 2] + values[seg_start + seg_count // 2]) / 2
+
+        mean_per_row = np.repeat(means, seg_count)
+        sq_dev = np.add.reduceat((values - mean_per_row) ** 2, seg_start)
+        stds = np.sqrt(sq_dev / np.maximum(seg_count - 1, 1))
+
+        for g, total, mean, median, lo, hi, std, count in zip(
+            np.flatnonzero(has).tolist(), sums.tolist(), means.tolist(), medians.tolist(),
+            mins.tolist(), maxs.tolist(), stds.tolist(), seg_count.tolist(),
+        ):
+            stats[g] = (total, mean, median, lo, hi, std if count > 1 else None)
+
+    metrics = []
+    for g in range(n_groups):
+        if g not in stats:
+            metrics.append(AnalysisMetrics(
+                total_documents=doc_counts[g],
+                total_value=0.0,
+                average_value=0.0,
+            ))
+            continue
+
+        total, mean, median, lo, hi, std = stats[g]
+        metrics.append(AnalysisMetrics(
+            total_documents=doc_counts[g],
+            total_value=total,
+            average_value=mean,
+            median_value=median,
+            min_value=lo,
+            max_value=hi,
+            standard_deviation=std,
+        ))
+
+    return metrics
+
+
+def calculate_invoice_metrics(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> AnalysisMetrics:
+    """
+    Calculate metrics from invoice extractions.
+
+    Args:
+        invoices: List of invoice extraction dictionaries
+        columns: Optional prebuilt InvoiceColumns for invoices
+
+    Returns:
+        AnalysisMetrics with calculated values
+    """
+    if not invoices:
+        return AnalysisMetrics(
+            total_documents=0,
+            total_value=0.0,
+            average_value=0.0,
+        )
+
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    return _metrics_from_totals(len(columns), columns.total)
+
+
+def calculate_vendor_metrics(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> Dict[str, AnalysisMetrics]:
     """
     Calculate metrics grouped by vendor.
 
     Args:
         invoices: List of invoice extraction dictionaries
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Dictionary mapping vendor names to their metrics
     """
-    vendor_invoices = {}
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-    for inv in invoices:
-        vendor = inv.get("vendor_name", "Unknown")
-        if vendor not in vendor_invoices:
-            vendor_invoices[vendor] = []
-        vendor_invoices[vendor].append(inv)
+    metrics = _grouped_metrics(columns.vendor_idx, len(columns.vendor_names), columns.total)
 
-    vendor_metrics = {}
-    for vendor, vendor_invs in vendor_invoices.items():
-        vendor_metrics[vendor] = calculate_invoice_metrics(vendor_invs)
+    return dict(zip(columns.vendor_names.tolist(), metrics))
 
-    return vendor_metrics
 
-
-def calculate_monthly_metrics(invoices: List[Dict[str, Any]]) -> Dict[str, AnalysisMetrics]:
+def calculate_monthly_metrics(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> Dict[str, AnalysisMetrics]:
     """
     Calculate metrics grouped by month.
 
     Args:
         invoices: List of invoice extraction dictionaries
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Dictionary mapping month keys to their metrics
     """
-    monthly_invoices = {}
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
 
-    for inv in invoices:
-        inv_date = inv.get("invoice_date")
-        if inv_date:
-            month_key = f"{inv_date.year}-{inv_date.month:02d}"
-            if month_key not in monthly_invoices:
-                monthly_invoices[month_key] = []
-            monthly_invoices[month_key].append(inv)
+    dated = np.flatnonzero(columns.has_date)
+    if not dated.size:
+        return {}
 
-    monthly_metrics = {}
-    for month, month_invs in monthly_invoices.items():
-        monthly_metrics[month] = calculate_invoice_metrics(month_invs)
+    months, month_idx = np.unique(columns.months[dated], return_inverse=True)
+    metrics = _grouped_metrics(month_idx, len(months), columns.total[dated])
 
-    return monthly_metrics
+    return {str(month): m for month, m in zip(months, metrics)}
 
 
 def calculate_percentage_distribution(values: List[float]) -> Dict[str, float]:
@@ -161,7 +223,7 @@ def calculate_percentage_distribution(values: List[float]) -> Dict[str, float]:
     if not values:
         return {}
 
-    total = sum(values)
+    total = math.fsum(values)
     if total == 0:
         return {}
 
@@ -169,7 +231,9 @@ def calculate_percentage_distribution(values: List[float]) -> Dict[str, float]:
 
 
 def calculate_category_breakdown(
-    invoices: List[Dict[str, Any]], category_field: str = "vendor_name"
+    invoices: List[Dict[str, Any]],
+    category_field: str = "vendor_name",
+    columns: Optional[InvoiceColumns] = None,
 ) -> Dict[str, float]:
     """
     Calculate spending breakdown by category.
@@ -177,50 +241,92 @@ def calculate_category_breakdown(
     Args:
         invoices: List of invoice extractions
         category_field: Field to group by
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
-        Dictionary mapping categories to total values
+        Dictionary mapping categories to total values, in first-seen order.
+        Use top_categories() when a ranking is needed.
+    """
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    rows = np.flatnonzero(columns.has_total)
+
+    if category_field == "vendor_name":
+        vidx = columns.vendor_idx[rows]
+        n_vendors = len(columns.vendor_names)
+        sums = np.bincount(vidx, weights=columns.total[rows], minlength=n_vendors)
+        seen = np.bincount(vidx, minlength=n_vendors) > 0
+        return dict(zip(columns.vendor_names[seen].tolist(), sums[seen].tolist()))
+
+    # Other fields are not columnar yet: encode them as integer codes in one
+    # pass, then sum per code like the vendor path.
+    category_index: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (category_index.setdefault(invoices[i].get(category_field, "Unknown"), len(category_index))
+         for i in rows.tolist()),
+        dtype=np.int64,
+        count=rows.size,
+    )
+    sums = np.bincount(codes, weights=columns.total[rows], minlength=len(category_index))
+
+    return dict(zip(category_index, sums.tolist()))
+
+
+def top_categories(breakdown: Dict[str, float], k: int = 5) -> List[Tuple[str, float]]:
     """
-    category_totals = {}
+    Get the highest-spend categories from a breakdown.
 
-    for inv in invoices:
-        category = inv.get(category_field, "Unknown")
-        total = inv.get("total")
+    Args:
+        breakdown: Category totals from calculate_category_breakdown
+        k: Number of categories to return
 
-        if total:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
+    Returns:
+        Up to k (category, total) pairs, largest first
+    """
+    return heapq.nlargest(k, breakdown.items(), key=lambda x: x[1])
 
-            if category not in category_totals:
-                category_totals[category] = 0.0
-            category_totals[category] += total
 
-    return dict(sorted(category_totals.items(), key=lambda x: x[1], reverse=True))
+SUMMARY_SECTIONS = frozenset({"overall", "by_vendor", "top_vendor", "category_breakdown"})
 
 
-def calculate_summary_statistics(invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
+def calculate_summary_statistics(
+    invoices: List[Dict[str, Any]],
+    columns: Optional[InvoiceColumns] = None,
+    include: AbstractSet[str] = SUMMARY_SECTIONS,
+) -> Dict[str, Any]:
     """
     Calculate comprehensive summary statistics.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
+        include: Sections to compute (subset of SUMMARY_SECTIONS); skipped
+            sections are omitted from the result
 
     Returns:
         Dictionary with various statistics
     """
-    metrics = calculate_invoice_metrics(invoices)
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    summary: Dict[str, Any] = {}
+
+    if "overall" in include:
+        summary["overall"] = calculate_invoice_metrics(invoices, columns=columns).to_dict()
+
+    if "by_vendor" in include or "top_vendor" in include:
+        vendor_metrics = calculate_vendor_metrics(invoices, columns=columns)
+
+        if "by_vendor" in include:
+            summary["by_vendor"] = {k: v.to_dict() for k, v in vendor_metrics.items()}
 
-    vendor_metrics = calculate_vendor_metrics(invoices)
-    top_vendor = max(vendor_metrics.items(), key=lambda x: x[1].total_value) if vendor_metrics else (None, None)
+        if "top_vendor" in include:
+            top_vendor = max(vendor_metrics.items(), key=lambda x: x[1].total_value) if vendor_metrics else (None, None)
+            summary["top_vendor"] = top_vendor[0] if top_vendor[0] else None
+            summary["top_vendor_total"] = top_vendor[1].total_value if top_vendor[1] else 0
 
-    category_breakdown = calculate_category_breakdown(invoices)
+    if "category_breakdown" in include:
+        summary["category_breakdown"] = calculate_category_breakdown(invoices, columns=columns)
 
-    return {
-        "overall": metrics.to_dict(),
-        "by_vendor": {k: v.to_dict() for k, v in vendor_metrics.items()},
-        "top_vendor": top_vendor[0] if top_vendor[0] else None,
-        "top_vendor_total": top_vendor[1].total_value if top_vendor[1] else 0,
-        "category_breakdown": category_breakdown,
-    }
+    return summary
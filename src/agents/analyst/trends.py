@@ -2,51 +2,54 @@
 Trend analyzer for time-series document analysis.
 """
 from typing import List, Dict, Any, Optional
-from datetime import date, datetime, timedelta
-from collections import defaultdict
-from decimal import Decimal
+from datetime import date
+from dataclasses import dataclass
 
+import numpy as np
 
+from src.agents.analyst._kernels import _forecast_linear_kernel, _month_bucket_kernel
+from src.agents.analyst._utils import _vendor_spans
+from src.agents.analyst.columns import InvoiceColumns
+
+
+@dataclass(slots=True)
 class TrendReport:
     """Report of trend analysis."""
 
-    def __init__(
-        self,
-        period_start: date,
-        period_end: date,
-        data_points: int,
-        trends: Dict[str, Any],
-        summary: str,
-    ):
-        self.period_start = period_start
-        self.period_end = period_end
-        self.data_points = data_points
-        self.trends = trends
-        self.summary = summary
-
-
-def analyze_spending_trends(invoices: List[Dict[str, Any]]) -> TrendReport:
+    period_start: date
+    period_end: date
+    data_points: int
+    trends: Dict[str, Any]
+    summary: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def analyze_spending_trends(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> TrendReport:
     """
     Analyze spending trends over time.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         TrendReport with analysis
     """
-    dated_invoices = []
-    for inv in invoices:
-        inv_date = inv.get("invoice_date")
-        total = inv.get("total")
-        if inv_date and total:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            dated_invoices.append({"date": inv_date, "total": total})
-
-    if not dated_invoices:
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    # One fused kernel filters dated rows with totals and sums them per month
+    # (months since 1970-01, offset from the earliest month); labels are only
+    # formatted for the months that occur.
+    first_key, sums, counts, total_spent, data_points, lo_ord, hi_ord = _month_bucket_kernel(
+        columns.date_ordinal, columns.months.view(np.int64), columns.total
+    )
+
+    if not data_points:
         return TrendReport(
             period_start=date.today(),
             period_end=date.today(),
@@ -55,82 +58,67 @@ def analyze_spending_trends(invoices: List[Dict[str, Any]]) -> TrendReport:
             summary="No data available for trend analysis",
         )
 
-    dated_invoices.sort(key=lambda x: x["date"])
+    period_start = date.fromordinal(lo_ord)
+    period_end = date.fromordinal(hi_ord)
 
-    period_start = dated_invoices[0]["date"]
-    period_end = dated_invoices[-1]["date"]
+    present = counts > 0
+    sums = sums[present]
+    months = (np.flatnonzero(present) + first_key).astype("datetime64[M]")
 
-    monthly_totals = defaultdict(float)
-    for inv in dated_invoices:
-        month_key = f"{inv['date'].year}-{inv['date'].month:02d}"
-        monthly_totals[month_key] += inv["total"]
-
-    monthly_data = sorted(monthly_totals.items())
-    if len(monthly_data) >= 2:
-        first_month = monthly_data[0][1]
-        last_month = monthly_data[-1][1]
+    if len(months) >= 2:
+        first_month = float(sums[0])
+        last_month = float(sums[-1])
         change_pct = ((last_month - first_month) / first_month * 100) if first_month > 0 else 0
     else:
         change_pct = 0
 
-    total_spent = sum(inv["total"] for inv in dated_invoices)
-    avg_monthly = total_spent / len(monthly_data) if monthly_data else 0
+    avg_monthly = total_spent / len(months)
 
     return TrendReport(
         period_start=period_start,
         period_end=period_end,
-        data_points=len(dated_invoices),
+        data_points=data_points,
         trends={
-            "monthly_totals": dict(monthly_data),
+            "monthly_totals": dict(zip(months.astype(str).tolist(), sums.tolist())),
             "total_spent": total_spent,
             "average_monthly": avg_monthly,
             "overall_change_percent": change_pct,
         },
-        summary=f"Analyzed {len(dated_invoices)} invoices from {period_start} to {period_end}. "
+        summary=f"Analyzed {data_points} invoices from {period_start} to {period_end}. "
         f"Total spent: ${total_spent:,.2f}, Monthly average: ${avg_monthly:,.2f}",
     )
 
 
-def analyze_vendor_trends(invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
+def analyze_vendor_trends(
+    invoices: List[Dict[str, Any]], columns: Optional[InvoiceColumns] = None
+) -> Dict[str, Any]:
     """
     Analyze vendor-specific trends.
 
     Args:
         invoices: List of invoice extractions
+        columns: Optional prebuilt InvoiceColumns for invoices
 
     Returns:
         Vendor trend analysis
     """
-    vendor_data = defaultdict(lambda: {"invoices": [], "total": 0, "count": 0})
-
-    for inv in invoices:
-        vendor = inv.get("vendor_name", "Unknown")
-        total = inv.get("total")
-        inv_date = inv.get("invoice_date")
-
-        if total and inv_date:
-            if isinstance(total, str):
-                total = float(total)
-            elif hasattr(total, "float_value"):
-                total = float(total)
-            vendor_data[vendor]["invoices"].append({"date": inv_date, "total": total})
-            vendor_data[vendor]["total"] += total
-            vendor_data[vendor]["count"] += 1
+    if columns is None:
+        columns = InvoiceColumns.from_dicts(invoices)
+
+    vendor_data = _vendor_spans(columns)
 
+    vendor_names = columns.vendor_names
     vendor_trends = {}
-    for vendor, data in vendor_data.items():
-        if data["count"] < 2:
+    for vendor, (_, first_total, _, last_total, vendor_total, count) in vendor_data.items():
+        if count < 2:
             continue
 
-        invoices_list = sorted(data["invoices"], key=lambda x: x["date"])
-        first_total = invoices_list[0]["total"]
-        last_total = invoices_list[-1]["total"]
         change_pct = ((last_total - first_total) / first_total * 100) if first_total > 0 else 0
 
-        vendor_trends[vendor] = {
-            "invoice_count": data["count"],
-            "total_spent": data["total"],
-            "average_invoice": data["total"] / data["count"],
+        vendor_trends[vendor_names[vendor]] = {
+            "invoice_count": count,
+            "total_spent": vendor_total,
+            "average_invoice": vendor_total / count,
             "first_invoice_total": first_total,
             "last_invoice_total": last_total,
             "change_percent": change_pct,
@@ -171,33 +159,21 @@ def forecast_next_period(historical_data: List[float], method: str = "linear") -
     Forecast next period value based on historical data.
 
     Args:
-        historical_data: List of historical values
+        historical_data: Historical values (list or float array)
         method: Forecasting method ("linear" or "moving_average")
 
     Returns:
         Forecasted value
     """
-    if not historical_data:
+    if not len(historical_data):
         return 0.0
 
-    if method == "moving_average":
-        window = min(3, len(historical_data))
-        return sum(historical_data[-window:]) / window
-
-    if len(historical_data) < 2:
-        return historical_data[-1]
+    values = np.ascontiguousarray(historical_data, dtype=np.float64)
 
-    n = len(historical_data)
-    x_mean = (n - 1) / 2
-    y_mean = sum(historical_data) / n
-
-    numerator = sum((i - x_mean) * (y - y_mean) for i, y in enumerate(historical_data))
-    denominator = sum((i - x_mean) ** 2 for i in range(n))
-
-    if denominator == 0:
-        return historical_data[-1]
+    if method == "moving_average":
+        return float(values[-3:].mean())
 
-    slope = numerator / denominator
-    intercept = y_mean - slope * x_mean
+    if values.size < 2:
+        return float(values[-1])
 
-    return slope * n + intercept
+    return float(_forecast_linear_kernel(values))
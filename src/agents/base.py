@@ -1,3 +1,4 @@
+import sys
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
 
@@ -37,12 +38,18 @@ class AgentFactory:
 
     @classmethod
     def register(cls, name: str, agent: BaseAgent):
-        cls._agents[name] = agent
+        # Interned keys let lookups with interned names match on identity
+        cls._agents[sys.intern(name)] = agent
 
     @classmethod
     def get(cls, name: str) -> Optional[BaseAgent]:
         return cls._agents.get(name)
 
+    @classmethod
+    def get_fast(cls, name: str) -> BaseAgent:
+        """Hot-path lookup for a registered agent; raises KeyError if missing."""
+        return cls._agents[name]
+
     @classmethod
     def list_agents(cls) -> list:
         return list(cls._agents.keys())
@@ -15,6 +15,8 @@ from src.agents.extraction.schemas import (
     ReceiptItem,
     get_extraction_schema,
     get_schema_fields,
+    get_field_table,
+    get_schema_adapter,
     validate_extraction_data,
 )
 from src.agents.extraction.validator import (
@@ -43,6 +45,8 @@ __all__ = [
     "ReceiptItem",
     "get_extraction_schema",
     "get_schema_fields",
+    "get_field_table",
+    "get_schema_adapter",
     "validate_extraction_data",
     "ExtractionValidator",
     "validate_extraction",
@@ -3,7 +3,8 @@ Extractor Agent - Extracts structured data from documents.
 """
 
 import logging
-from typing import Dict, Any, Optional
+from functools import cache
+from typing import Dict, Any, Optional, Sequence
 
 from src.agents.base import BaseAgent, create_agent_node
 from src.agents.state import (
@@ -68,16 +69,19 @@ class ExtractorAgent(BaseAgent):
             state["errors"].append(f"No ingestion result for document {current_doc_id}")
             return state
 
+        get = ingestion_result.get
+        images = get("images") or ()
+
         # Get document type
-        document_type = ingestion_result.get("document_type", DocumentType.OTHER)
+        document_type = get("document_type", DocumentType.OTHER)
         if isinstance(document_type, str):
             document_type = DocumentType(document_type)
+        doc_type_str = document_type.value if isinstance(document_type, DocumentType) else str(document_type)
 
         # Get content
-        content = ingestion_result.get("content", "")
+        content = get("content", "")
         if not content:
             # Try to use images if no text
-            images = ingestion_result.get("images", [])
             if images:
                 content = "[Image-based document - use vision extraction]"
             else:
@@ -85,10 +89,9 @@ class ExtractorAgent(BaseAgent):
                 return state
 
         # Extract data
-        extracted_data = self._extract_data(content, document_type, ingestion_result)
+        extracted_data = self._extract_data(content, doc_type_str, images)
 
         # Validate
-        doc_type_str = document_type.value if isinstance(document_type, DocumentType) else str(document_type)
         is_valid, validation_errors, completeness = validate_extraction(
             extracted_data, doc_type_str
         )
@@ -126,14 +129,11 @@ class ExtractorAgent(BaseAgent):
     def _extract_data(
         self,
         content: str,
-        document_type: DocumentType,
-        ingestion_result: Dict[str, Any],
+        doc_type_str: str,
+        images: Sequence[Any],
     ) -> Dict[str, Any]:
         """Extract structured data from content."""
-        doc_type_str = document_type.value if isinstance(document_type, DocumentType) else str(document_type)
-
         # Check if we have images and should use vision
-        images = ingestion_result.get("images", [])
         has_images = len(images) > 0
 
         if has_images and not content.strip():
@@ -189,5 +189,12 @@ class ExtractorAgent(BaseAgent):
         )
 
 
+@cache
+def _get_extraction_node():
+    """Build the extractor node on first use so importing this module stays cheap."""
+    return create_agent_node(ExtractorAgent())
+
+
 # Create LangGraph node
-extraction_node = create_agent_node(ExtractorAgent())
+def extraction_node(state: AgentState) -> AgentState:
+    return _get_extraction_node()(state)
@@ -2,8 +2,10 @@
 Extraction schemas for different document types.
 """
 
-from typing import List, Optional, Any
-from pydantic import BaseModel, Field, field_validator
+import sys
+from functools import lru_cache
+from typing import List, Optional, Any, Tuple
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
 from datetime import date
 from decimal import Decimal
 
@@ -155,16 +157,52 @@ SCHEMA_MAP = {
     "other": GenericExtraction,
 }
 
+# Callers almost always pass a lowercase DocumentType value, so the lookups
+# below try the key as given before falling back to .lower().
+_SCHEMA_KEYS = frozenset(sys.intern(name) for name in SCHEMA_MAP)
 
+
+def _schema_key(document_type: str) -> str:
+    """Normalize a document type to a SCHEMA_MAP key, skipping .lower() when possible."""
+    return document_type if document_type in _SCHEMA_KEYS else document_type.lower()
+
+
+# Field names per schema type, resolved once at import
+_FIELDS_MAP = {name: tuple(schema.model_fields) for name, schema in SCHEMA_MAP.items()}
+_DEFAULT_FIELDS = tuple(GenericExtraction.model_fields)
+
+# (name, annotation, is_required) per field, read off FieldInfo once at import
+_FIELD_TABLES = {
+    name: tuple(
+        (field, info.annotation, info.is_required())
+        for field, info in schema.model_fields.items()
+    )
+    for name, schema in SCHEMA_MAP.items()
+}
+
+# Validators built once per schema type
+_ADAPTERS = {name: TypeAdapter(schema) for name, schema in SCHEMA_MAP.items()}
+
+
+@lru_cache(maxsize=16)
 def get_extraction_schema(document_type: str) -> type[BaseModel]:
     """Get the appropriate schema for a document type."""
-    return SCHEMA_MAP.get(document_type.lower(), GenericExtraction)
+    return SCHEMA_MAP.get(_schema_key(document_type), GenericExtraction)
+
+
+def get_schema_fields(schema_type: str) -> Tuple[str, ...]:
+    """Get field names for a schema type (shared, so returned as a tuple)."""
+    return _FIELDS_MAP.get(_schema_key(schema_type), _DEFAULT_FIELDS)
+
 
+def get_field_table(document_type: str) -> Tuple[Tuple[str, Any, bool], ...]:
+    """Get (name, annotation, is_required) for each field of a schema type."""
+    return _FIELD_TABLES.get(_schema_key(document_type), _FIELD_TABLES["other"])
 
-def get_schema_fields(schema_type: str) -> List[str]:
-    """Get list of field names for a schema type."""
-    schema = get_extraction_schema(schema_type)
-    return list(schema.model_fields.keys())
+
+def get_schema_adapter(document_type: str) -> TypeAdapter:
+    """Get the prebuilt validator for a document type."""
+    return _ADAPTERS.get(_schema_key(document_type), _ADAPTERS["other"])
 
 
 def validate_extraction_data(
@@ -174,12 +212,17 @@ def validate_extraction_data(
     """
     Validate extraction data against the appropriate schema.
 
+    Args:
+        data: Extraction data
+        document_type: Document type
+
     Returns:
         Tuple of (is_valid, error_messages)
     """
-    schema = get_extraction_schema(document_type)
+    adapter = get_schema_adapter(document_type)
     try:
-        schema.model_validate(data)
+        adapter.validate_python(data)
         return True, []
-    except Exception as e:
+    except ValidationError as e:
         return False, [str(e)]
+
@@ -3,16 +3,59 @@ Schema validation for extraction results.
 """
 
 import logging
+from datetime import date
+from math import fsum
 from typing import Dict, Any, List, Tuple, Optional
 
-from src.agents.extraction.schemas import get_extraction_schema
+from pydantic import TypeAdapter
+
+from src.agents.extraction.schemas import get_schema_adapter, get_schema_fields
 
 logger = logging.getLogger(__name__)
 
 
+def _as_date(value: Any) -> Any:
+    """Parse ISO date strings (date or datetime form) to a date; pass other values through."""
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _is_filled(value: Any) -> bool:
+    """Whether an extracted value counts as filled (non-blank strings, non-empty containers)."""
+    if isinstance(value, str):
+        return bool(value.strip())
+    if isinstance(value, (list, dict)):
+        return bool(value)
+    return value is not None
+
+
+def _field_completeness(
+    data: Dict[str, Any],
+    document_type: str,
+    fields: Optional[Tuple[str, ...]] = None,
+) -> float:
+    """Fraction of schema fields filled in data (0.0 for schemas without fields)."""
+    if fields is None:
+        fields = get_schema_fields(document_type)
+
+    if not fields:
+        return 0.0
+
+    get = data.get
+    return sum(1 for name in fields if _is_filled(get(name))) / len(fields)
+
+
 class ExtractionValidator:
     """Validates extraction results against Pydantic schemas."""
 
+    # Business rule method per document type
+    _RULE_DISPATCH = {
+        "invoice": "_validate_invoice_rules",
+        "receipt": "_validate_receipt_rules",
+        "contract": "_validate_contract_rules",
+    }
+
     def __init__(self, strict_mode: bool = False):
         self.strict_mode = strict_mode
         self.validation_errors = []
@@ -21,6 +64,7 @@ class ExtractionValidator:
         self,
         data: Dict[str, Any],
         document_type: str,
+        adapter: Optional[TypeAdapter] = None,
     ) -> Tuple[bool, List[str]]:
         """
         Validate extraction data against schema.
@@ -28,16 +72,18 @@ class ExtractionValidator:
         Args:
             data: Extracted data dictionary
             document_type: Type of document
+            adapter: Schema validator, if the caller already looked it up
 
         Returns:
             Tuple of (is_valid, error_messages)
         """
-        schema = get_extraction_schema(document_type)
+        if adapter is None:
+            adapter = get_schema_adapter(document_type)
         errors = []
 
         try:
             # Try to validate against schema
-            schema.model_validate(data)
+            adapter.validate_python(data)
             return True, []
         except Exception as e:
             errors.append(str(e))
@@ -55,27 +101,24 @@ class ExtractionValidator:
         Args:
             field_name: Name of the field
             value: Value to validate
-            field_schema: Field schema definition
+            field_schema: Pydantic FieldInfo, or a (name, annotation,
+                is_required) entry from get_field_table
 
         Returns:
             Tuple of (is_valid, error_message)
         """
-        # Check required fields using Pydantic v2 approach
-        if field_schema.is_required() if hasattr(field_schema, 'is_required') else not field_schema.has_default() and value is None:
+        if type(field_schema) is tuple:
+            _, expected_type, required = field_schema
+        else:
+            expected_type, required = field_schema.annotation, field_schema.is_required()
+
+        # Check required fields
+        if required:
             return False, f"Required field '{field_name}' is missing"
 
         # Type validation
-        if value is not None:
-            # Get the annotation from Pydantic v2 FieldInfo
-            if hasattr(field_schema, 'annotation'):
-                expected_type = field_schema.annotation
-            elif hasattr(field_schema, 'type_'):
-                expected_type = field_schema.type_
-            else:
-                return True, None  # Skip type check if we can't determine type
-
-            if not isinstance(value, expected_type):
-                return False, f"Field '{field_name}' has incorrect type"
+        if value is not None and not isinstance(value, expected_type):
+            return False, f"Field '{field_name}' has incorrect type"
 
         return True, None
 
@@ -83,6 +126,7 @@ class ExtractionValidator:
         self,
         data: Dict[str, Any],
         document_type: str,
+        fields: Optional[Tuple[str, ...]] = None,
     ) -> float:
         """
         Calculate field completeness score.
@@ -90,29 +134,12 @@ class ExtractionValidator:
         Args:
             data: Extraction data
             document_type: Document type
+            fields: Schema field names, if the caller already looked them up
 
         Returns:
             Completeness score from 0 to 1
         """
-        schema = get_extraction_schema(document_type)
-        fields = schema.model_fields
-
-        if not fields:
-            return 0.0
-
-        filled_fields = 0
-        for field_name, field_info in fields.items():
-            if field_name in data and data[field_name] is not None:
-                # Check if the value is not empty
-                value = data[field_name]
-                if isinstance(value, str) and value.strip():
-                    filled_fields += 1
-                elif isinstance(value, (list, dict)) and len(value) > 0:
-                    filled_fields += 1
-                elif not isinstance(value, (str, list, dict)):
-                    filled_fields += 1
-
-        return filled_fields / len(fields)
+        return _field_completeness(data, document_type, fields)
 
     def validate_business_rules(
         self,
@@ -129,16 +156,8 @@ class ExtractionValidator:
         Returns:
             List of validation warnings/errors
         """
-        errors = []
-
-        if document_type == "invoice":
-            errors.extend(self._validate_invoice_rules(data))
-        elif document_type == "receipt":
-            errors.extend(self._validate_receipt_rules(data))
-        elif document_type == "contract":
-            errors.extend(self._validate_contract_rules(data))
-
-        return errors
+        rules = self._RULE_DISPATCH.get(document_type)
+        return getattr(self, rules)(data) if rules else []
 
     def _validate_invoice_rules(self, data: Dict[str, Any]) -> List[str]:
         """Validate invoice-specific business rules."""
@@ -147,14 +166,14 @@ class ExtractionValidator:
         # Check total consistency
         line_items = data.get("line_items", [])
         if line_items:
-            calculated_total = sum(
+            calculated_total = fsum(
                 item.get("total", 0) for item in line_items
             )
             tax = data.get("tax", 0)
             stated_total = data.get("total", 0)
 
             # Allow small rounding differences
-            if abs(calculated_total + tax - stated_total) > 0.01:
+            if abs(fsum((calculated_total, tax, -stated_total))) > 0.01:
                 errors.append(
                     "Total does not match sum of line items plus tax"
                 )
@@ -164,13 +183,7 @@ class ExtractionValidator:
         due_date = data.get("due_date")
         if invoice_date and due_date:
             # Handle both string dates and date objects
-            if isinstance(invoice_date, str):
-                from datetime import datetime
-                invoice_date = datetime.fromisoformat(invoice_date.replace("Z", "+00:00")).date() if "T" in invoice_date else datetime.strptime(invoice_date, "%Y-%m-%d").date()
-            if isinstance(due_date, str):
-                from datetime import datetime
-                due_date = datetime.fromisoformat(due_date.replace("Z", "+00:00")).date() if "T" in due_date else datetime.strptime(due_date, "%Y-%m-%d").date()
-            if due_date < invoice_date:
+            if _as_date(due_date) < _as_date(invoice_date):
                 errors.append("Due date is before invoice date")
 
         return errors
@@ -185,7 +198,7 @@ class ExtractionValidator:
         tip = data.get("tip", 0)
         total = data.get("total", 0)
 
-        if abs(subtotal + tax + tip - total) > 0.01:
+        if abs(fsum((subtotal, tax, tip, -total))) > 0.01:
             errors.append(
                 "Total does not match subtotal plus tax plus tip"
             )
@@ -204,7 +217,7 @@ class ExtractionValidator:
         # Check date ordering
         effective = data.get("effective_date")
         expiration = data.get("expiration_date")
-        if effective and expiration and expiration < effective:
+        if effective and expiration and _as_date(expiration) < _as_date(effective):
             errors.append("Expiration date is before effective date")
 
         return errors
@@ -228,14 +241,18 @@ def validate_extraction(
     """
     validator = ExtractionValidator(strict_mode=strict)
 
+    # Resolve the schema once for validation and completeness
+    adapter = get_schema_adapter(document_type)
+    fields = get_schema_fields(document_type)
+
     # Schema validation
-    is_valid, errors = validator.validate(data, document_type)
+    is_valid, errors = validator.validate(data, document_type, adapter)
 
     # Business rules validation
     business_errors = validator.validate_business_rules(data, document_type)
     errors.extend(business_errors)
 
     # Calculate completeness
-    completeness = validator.get_field_completeness(data, document_type)
+    completeness = validator.get_field_completeness(data, document_type, fields)
 
     return is_valid and len(errors) == 0, errors, completeness
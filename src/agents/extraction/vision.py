@@ -2,27 +2,107 @@
 Vision extraction wrapper using Gemini for document extraction.
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
 
 import google.generativeai as genai
+import orjson
 from langsmith import traceable
 
 from src.agents.extraction.schemas import (
     get_extraction_schema,
+    get_schema_fields,
     SCHEMA_MAP,
 )
+from src.agents.extraction.validator import _field_completeness
 
 logger = logging.getLogger(__name__)
 
 
+def _strip_code_fence(text: str) -> str:
+    """Strip surrounding whitespace and a markdown code fence, slicing once."""
+    text = text.strip()
+    if not text.startswith("```"):
+        return text
+
+    first_nl = text.find("\n")
+    if first_nl == -1:
+        return ""
+
+    # Drop the closing fence line if there is one
+    last_nl = text.rfind("\n")
+    if text.startswith("```", last_nl + 1):
+        return text[first_nl + 1:last_nl] if last_nl > first_nl else ""
+    return text[first_nl + 1:]
+
+
+@lru_cache(maxsize=None)
+def _schema_prompt_fragment(document_type: str) -> str:
+    """JSON schema text for a document type, as embedded in extraction prompts."""
+    return json.dumps(get_extraction_schema(document_type).model_json_schema(), indent=2)
+
+
+@lru_cache(maxsize=None)
+def _vision_prompt(document_type: str) -> str:
+    """Default image extraction prompt for a document type."""
+    return f"""Analyze this document and extract the information into a structured format.
+
+Document type: {document_type}
+
+Extract all relevant fields according to this schema:
+{_schema_prompt_fragment(document_type)}
+
+Return ONLY valid JSON matching the schema. If a field is not present in the document, use null for optional fields."""
+
+
+@lru_cache(maxsize=None)
+def _text_prompt_parts(document_type: str) -> Tuple[str, str]:
+    """Text extraction prompt for a document type, split around the document text."""
+    return (
+        f"""Analyze this document text and extract the information into a structured format.
+
+Document type: {document_type}
+
+Text content:
+""",
+        f"""
+
+Extract all relevant fields according to this schema:
+{_schema_prompt_fragment(document_type)}
+
+Return ONLY valid JSON matching the schema. If a field is not present in the document, use null for optional fields.""",
+    )
+
+
+@lru_cache(maxsize=None)
+def _llm_prompt_parts(document_type: str) -> Tuple[str, str]:
+    """LLMExtractor prompt for a document type, split around the document text."""
+    return (
+        f"""Extract structured data from this {document_type} text.
+
+Text:
+""",
+        f"""
+
+Schema:
+{_schema_prompt_fragment(document_type)}
+
+Return ONLY valid JSON.""",
+    )
+
+
 class VisionExtractor:
     """Extracts structured data from documents using Gemini vision."""
 
     def __init__(self, model_name: str = "gemini-3-flash-preview"):
         self.model_name = model_name
         self.model = None
+        # Document types are a closed set, so every prompt is built up front
+        self._prompts = {dt: _vision_prompt(dt) for dt in SCHEMA_MAP}
+        self._text_prompts = {dt: _text_prompt_parts(dt) for dt in SCHEMA_MAP}
         self._initialize_model()
 
     def _initialize_model(self):
@@ -70,20 +150,9 @@ class VisionExtractor:
             return {"error": "Model not available"}
 
         try:
-            # Get the schema for the document type
-            schema = get_extraction_schema(document_type)
-            schema_json = schema.model_json_schema()
-
             # Build prompt
             if prompt is None:
-                prompt = f"""Analyze this document and extract the information into a structured format.
-
-Document type: {document_type}
-
-Extract all relevant fields according to this schema:
-{json.dumps(schema_json, indent=2)}
-
-Return ONLY valid JSON matching the schema. If a field is not present in the document, use null for optional fields."""
+                prompt = self._prompts.get(document_type) or _vision_prompt(document_type)
 
             # Generate content
             response = self.model.generate_content([
@@ -98,6 +167,47 @@ Return ONLY valid JSON matching the schema. If a field is not present in the doc
             logger.error(f"Extraction failed: {e}")
             return {"error": str(e)}
 
+    @traceable(name="vision-extract-batch")
+    async def extract_batch(
+        self,
+        items: List[Tuple[bytes, str]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract structured data from several images concurrently.
+
+        Requests are issued together with asyncio.gather, so the batch takes
+        roughly as long as its slowest request instead of the sum of all.
+
+        Args:
+            items: (image_bytes, document_type) pairs
+
+        Returns:
+            Extracted data dictionaries, in the same order as items
+        """
+        if not self.model:
+            logger.error("Gemini model not initialized")
+            return [{"error": "Model not available"} for _ in items]
+
+        responses = await asyncio.gather(
+            *(
+                self.model.generate_content_async([
+                    self._prompts.get(document_type) or _vision_prompt(document_type),
+                    {"mime_type": "image/jpeg", "data": image_bytes},
+                ])
+                for image_bytes, document_type in items
+            ),
+            return_exceptions=True,
+        )
+
+        results = []
+        for (_, document_type), response in zip(items, responses):
+            if isinstance(response, Exception):
+                logger.error(f"Extraction failed: {response}")
+                results.append({"error": str(response)})
+            else:
+                results.append(self._parse_response(response.text, document_type))
+        return results
+
     def extract_from_pdf_page(
         self,
         pdf_bytes: bytes,
@@ -140,20 +250,8 @@ Return ONLY valid JSON matching the schema. If a field is not present in the doc
             return {"error": "Model not available"}
 
         try:
-            schema = get_extraction_schema(document_type)
-            schema_json = schema.model_json_schema()
-
-            prompt = f"""Analyze this document text and extract the information into a structured format.
-
-Document type: {document_type}
-
-Text content:
-{text}
-
-Extract all relevant fields according to this schema:
-{json.dumps(schema_json, indent=2)}
-
-Return ONLY valid JSON matching the schema. If a field is not present in the document, use null for optional fields."""
+            head, tail = self._text_prompts.get(document_type) or _text_prompt_parts(document_type)
+            prompt = head + text + tail
 
             response = self.model.generate_content(prompt)
             return self._parse_response(response.text, document_type)
@@ -180,14 +278,10 @@ Return ONLY valid JSON matching the schema. If a field is not present in the doc
         try:
             # Try to extract JSON from response
             # Handle markdown code blocks
-            response_text = response_text.strip()
-            if response_text.startswith("```"):
-                # Remove code block markers
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1] if lines[-1].startswith("```") else lines[1:])
+            response_text = _strip_code_fence(response_text)
 
             # Parse JSON
-            data = json.loads(response_text)
+            data = orjson.loads(response_text)
             return data
 
         except json.JSONDecodeError as e:
@@ -204,6 +298,7 @@ class LLMExtractor:
     def __init__(self, model_name: str = "gemini-3-flash-preview"):
         self.model_name = model_name
         self.model = None
+        self._prompts = {dt: _llm_prompt_parts(dt) for dt in SCHEMA_MAP}
         self._initialize_model()
 
     def _initialize_model(self):
@@ -248,28 +343,15 @@ class LLMExtractor:
             return {"error": "Model not available"}
 
         try:
-            schema = get_extraction_schema(document_type)
-            schema_json = schema.model_json_schema()
-
-            prompt = f"""Extract structured data from this {document_type} text.
-
-Text:
-{text}
-
-Schema:
-{json.dumps(schema_json, indent=2)}
-
-Return ONLY valid JSON."""
+            head, tail = self._prompts.get(document_type) or _llm_prompt_parts(document_type)
+            prompt = head + text + tail
 
             response = self.model.generate_content(prompt)
 
             # Parse response
-            response_text = response.text.strip()
-            if response_text.startswith("```"):
-                lines = response_text.split("\n")
-                response_text = "\n".join(lines[1:-1] if lines[-1].startswith("```") else lines[1:])
+            response_text = _strip_code_fence(response.text)
 
-            return json.loads(response_text)
+            return orjson.loads(response_text)
 
         except Exception as e:
             logger.error(f"LLM extraction failed: {e}")
@@ -290,24 +372,11 @@ def calculate_extraction_confidence(
     Returns:
         Confidence score 0-1
     """
-    schema = get_extraction_schema(document_type)
-    fields = schema.model_fields
-
+    fields = get_schema_fields(document_type)
     if not fields:
         return 0.5
 
-    filled = 0
-    for field_name in fields:
-        if field_name in extracted_data and extracted_data[field_name] is not None:
-            value = extracted_data[field_name]
-            if isinstance(value, str) and value.strip():
-                filled += 1
-            elif isinstance(value, (list, dict)) and len(value) > 0:
-                filled += 1
-            elif value is not None:
-                filled += 1
-
-    base_confidence = filled / len(fields)
+    base_confidence = _field_completeness(extracted_data, document_type, fields)
 
     # Penalize for errors
     if "error" in extracted_data:
@@ -2,7 +2,7 @@
 
 from src.agents.ingestion.agent import IngestionAgent, ingestion_node
 from src.agents.ingestion.classifier import DocumentClassifier
-from src.agents.ingestion.parser import DocumentParser, extract_text_from_file
+from src.agents.ingestion.parser import DocumentParser, extract_pdf_text, extract_text_from_file
 from src.agents.ingestion.chunker import TextChunker, chunk_for_rag
 
 __all__ = [
@@ -10,6 +10,7 @@ __all__ = [
     "ingestion_node",
     "DocumentClassifier",
     "DocumentParser",
+    "extract_pdf_text",
     "extract_text_from_file",
     "TextChunker",
     "chunk_for_rag",
@@ -0,0 +1,145 @@
+"""
+Numba-compiled keyword scoring for batch document classification.
+
+Texts and keywords are passed as concatenated uint32 code-point arrays
+(UTF-32) with offset arrays marking where each one starts and ends.
+"""
+import numpy as np
+from numba import njit
+
+# Keywords are bucketed by the low 6 bits of their first two code points
+_N_BUCKETS = 64 * 64
+
+
+@njit(cache=True, nogil=True)
+def _bucket(c0, c1):
+    """Bucket for a position whose first two code points are c0 and c1."""
+    return ((c0 & 63) << 6) | (c1 & 63)
+
+
+@njit(cache=True, nogil=True)
+def _build_buckets(kw, kw_offsets):
+    """
+    Index keywords by their leading code-point pair.
+
+    Single-character keywords go in every bucket for their character, so a
+    match is found whatever follows it.
+
+    Returns:
+        Tuple of (bucket start offsets, keyword index per entry)
+    """
+    n_kw = len(kw_offsets) - 1
+    starts = np.zeros(_N_BUCKETS + 1, dtype=np.int64)
+    for k in range(n_kw):
+        ks = kw_offsets[k]
+        m = kw_offsets[k + 1] - ks
+        if m >= 2:
+            starts[_bucket(kw[ks], kw[ks + 1]) + 1] += 1
+        elif m == 1:
+            for c1 in range(64):
+                starts[_bucket(kw[ks], c1) + 1] += 1
+    for b in range(_N_BUCKETS):
+        starts[b + 1] += starts[b]
+
+    entries = np.empty(starts[_N_BUCKETS], dtype=np.int64)
+    fill = starts[:_N_BUCKETS].copy()
+    for k in range(n_kw):
+        ks = kw_offsets[k]
+        m = kw_offsets[k + 1] - ks
+        if m >= 2:
+            b = _bucket(kw[ks], kw[ks + 1])
+            entries[fill[b]] = k
+            fill[b] += 1
+        elif m == 1:
+            for c1 in range(64):
+                b = _bucket(kw[ks], c1)
+                entries[fill[b]] = k
+                fill[b] += 1
+    return starts, entries
+
+
+@njit(cache=True, nogil=True)
+def _score_batch(buf, offsets, kw, kw_offsets, owners):
+    """
+    Count the distinct keywords of each type present in each text.
+
+    Each text is walked once; at every position only the keywords sharing
+    its leading code-point pair are compared.
+
+    Args:
+        buf: uint32 code points of all (lowercased) texts, concatenated
+        offsets: int64 text boundaries, len(texts) + 1 entries
+        kw: uint32 code points of all keywords, concatenated
+        kw_offsets: int64 keyword boundaries, n_keywords + 1 entries
+        owners: bool (n_keywords, n_types) matrix of keyword owners
+
+    Returns:
+        int32 (n_texts, n_types) keyword counts
+    """
+    n_docs = len(offsets) - 1
+    n_kw, n_types = owners.shape
+    starts, entries = _build_buckets(kw, kw_offsets)
+
+    scores = np.zeros((n_docs, n_types), dtype=np.int32)
+    for d in range(n_docs):
+        start = offsets[d]
+        stop = offsets[d + 1]
+
+        found = np.zeros(n_kw, dtype=np.bool_)
+        for k in range(n_kw):
+            # The empty string is in every text
+            found[k] = kw_offsets[k + 1] == kw_offsets[k]
+
+        for p in range(start, stop):
+            c1 = buf[p + 1] if p + 1 < stop else 0
+            b = _bucket(buf[p], c1)
+            for e in range(starts[b], starts[b + 1]):
+                k = entries[e]
+                if found[k]:
+                    continue
+                ks = kw_offsets[k]
+                m = kw_offsets[k + 1] - ks
+                if p + m > stop:
+                    continue
+                j = 0
+                while j < m and buf[p + j] == kw[ks + j]:
+                    j += 1
+                if j == m:
+                    found[k] = True
+
+        for k in range(n_kw):
+            if found[k]:
+                for t in range(n_types):
+                    if owners[k, t]:
+                        scores[d, t] += 1
+    return scores
+
+
+def _encode(strings):
+    """Concatenate strings into a uint32 code-point array plus int64 offsets."""
+    offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in strings], out=offsets[1:])
+    buf = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+    return buf, offsets
+
+
+def score_batch(texts, keywords, owners):
+    """
+    Count, per text, the distinct keywords of each type it contains.
+
+    Args:
+        texts: Lowercased texts
+        keywords: Distinct lowercased keywords
+        owners: bool (len(keywords), n_types) matrix of keyword owners
+
+    Returns:
+        int32 array of shape (len(texts), n_types)
+    """
+    buf, offsets = _encode(texts)
+    kw, kw_offsets = _encode(keywords)
+    return _score_batch(buf, offsets, kw, kw_offsets, owners)
+
+
+def warmup() -> None:
+    """Compile (or load from the on-disk cache) the scoring kernel ahead of traffic."""
+    score_batch(["invoice total"], ["invoice", "total"], np.ones((2, 1), dtype=np.bool_))
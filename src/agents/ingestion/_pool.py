@@ -0,0 +1,85 @@
+"""
+Process pool shared by the CPU-bound ingestion steps (PDF extraction, chunking).
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Workers start from a clean interpreter rather than a fork of a threaded
+# server process (API threads, Numba, HTTP clients), which can deadlock
+_MP_CONTEXT = multiprocessing.get_context("forkserver" if sys.platform == "linux" else "spawn")
+
+
+def can_use_pool() -> bool:
+    """Whether this process may start workers (daemonic processes, e.g. Celery prefork workers, cannot)."""
+    return not multiprocessing.current_process().daemon
+
+
+class WorkerPool:
+    """
+    Lazily started process pool that is rebuilt after a worker crash.
+
+    A worker dying (e.g. on a malformed PDF) breaks a ProcessPoolExecutor
+    for good; run() discards the broken executor so the next call starts a
+    fresh one, and re-raises so the caller can fall back to in-process work.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        atexit.register(self.shutdown)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=_MP_CONTEXT
+                )
+            return self._executor
+
+    def run(self, fn: Callable[..., Any], calls: Iterable[Tuple[Any, ...]]) -> List[Any]:
+        """
+        Run fn once per argument tuple in the pool.
+
+        Args:
+            fn: Picklable module-level function
+            calls: Argument tuples, one per task
+
+        Returns:
+            Results in the order of calls
+
+        Raises:
+            BrokenProcessPool: A worker died; the pool is reset first
+        """
+        executor = self._get_executor()
+        try:
+            futures = [executor.submit(fn, *args) for args in calls]
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self) -> None:
+        """Stop the workers, if any were started."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def default_workers(cap: int) -> int:
+    """Worker count bounded by both the CPU count and cap."""
+    return max(1, min(os.cpu_count() or 1, cap))
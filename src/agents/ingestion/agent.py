@@ -4,7 +4,8 @@ Ingestion Agent - Handles document ingestion, classification, and parsing.
 
 import uuid
 import logging
-from typing import Dict, Any, Optional
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, List, Optional
 
 from src.agents.base import BaseAgent, create_agent_node
 from src.agents.state import (
@@ -18,9 +19,24 @@ from src.agents.state import (
 from src.agents.ingestion.classifier import DocumentClassifier
 from src.agents.ingestion.parser import DocumentParser
 from src.agents.ingestion.chunker import TextChunker
+from src.agents.ingestion._pool import WorkerPool, can_use_pool, default_workers
 
 logger = logging.getLogger(__name__)
 
+# Documents longer than this are chunked in a worker process; below it the
+# pickling round trip costs more than the chunking itself
+_POOL_MIN_CHARS = 100_000
+
+
+# Started on first use; large documents are rare, so a few workers suffice
+_CHUNK_POOL = WorkerPool(max_workers=default_workers(4))
+
+
+def _chunk_texts(text: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Chunk text and keep only the chunk texts (runs in pool workers)."""
+    chunker = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return [c["text"] for c in chunker.iter_chunks(text)]
+
 
 class IngestionAgent(BaseAgent):
     """Agent responsible for document ingestion and preprocessing."""
@@ -76,11 +92,8 @@ Always provide accurate classification and comprehensive parsing."""
         # Step 2: Classify document
         doc_type = self.classifier.classify(parse_result.get("text", ""), file_path)
 
-        # Step 3: Chunk text
-        chunks = self.chunker.chunk_text(
-            parse_result.get("text", ""),
-            metadata={"document_id": current_doc_id, "document_type": doc_type},
-        )
+        # Step 3: Chunk text (only the chunk texts are kept)
+        chunks = self._chunk_text(parse_result.get("text", ""))
 
         # Build ingestion result
         ingestion_result: IngestionResult = {
@@ -88,7 +101,7 @@ Always provide accurate classification and comprehensive parsing."""
             "content": parse_result.get("text", ""),
             "tables": parse_result.get("tables", []),
             "images": parse_result.get("images", []),
-            "chunks": [c["text"] for c in chunks],
+            "chunks": chunks,
             "metadata": {
                 "file_path": file_path,
                 "page_count": parse_result.get("page_count", 0),
@@ -113,6 +126,25 @@ Always provide accurate classification and comprehensive parsing."""
         logger.info(f"Ingested document {current_doc_id} as {doc_type}")
         return state
 
+    def _chunk_text(self, text: str) -> List[str]:
+        """
+        Chunk document text, offloading large documents to a process pool.
+
+        Chunking is CPU-bound and holds the GIL, so large documents run in a
+        worker process. Daemonic processes (e.g. Celery prefork workers)
+        cannot start children and always chunk in-process, as does every
+        call that finds the pool broken.
+        """
+        chunker = self.chunker
+        if len(text) > _POOL_MIN_CHARS and can_use_pool():
+            try:
+                return _CHUNK_POOL.run(
+                    _chunk_texts, [(text, chunker.chunk_size, chunker.chunk_overlap)]
+                )[0]
+            except BrokenProcessPool:
+                logger.warning("Chunking pool broke; chunking in-process")
+        return [c["text"] for c in chunker.iter_chunks(text)]
+
     def _get_file_path(self, document_id: str) -> str:
         """Get file path for document ID."""
         # In production, this would query the database or storage
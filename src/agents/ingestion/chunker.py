@@ -4,10 +4,27 @@ Text chunking for RAG (Retrieval-Augmented Generation).
 
 import re
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+
+from src.agents.ingestion._chunk_kernel import find_boundaries
 
 logger = logging.getLogger(__name__)
 
+# Texts longer than this are chunked with the compiled boundary kernel
+_KERNEL_MIN_CHARS = 50_000
+
+# Patterns compiled once at import
+_WS_RE = re.compile(r"\s+")
+# Whitespace that _WS_RE would change: anything but a lone space
+_WS_DIRTY = re.compile(r"[^\S ]| \s")
+_PARA_SPLIT = re.compile(r"\n\s*\n")
+_SENT_END = re.compile(r"[.!?]\s+")
+_HEADING = re.compile(r"^(#{1,6}\s+.+|[A-Z][^\.]+:\s*$|\n[A-Z][^\.]+:\s*$)", re.MULTILINE)
+_MD_HEADING = re.compile(r"^#{1,6}\s+", re.MULTILINE)
+
+# Control characters to delete, as a str.translate table
+_CTRL_TRANS = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+
 
 class TextChunker:
     """Chunks text into smaller pieces for vector storage."""
@@ -38,41 +55,65 @@ class TextChunker:
         Returns:
             List of chunk dictionaries with text and metadata
         """
+        return list(self.iter_chunks(text, metadata))
+
+    def iter_chunks(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily split text into overlapping chunks.
+
+        Same chunks as chunk_text, yielded one at a time so callers that only
+        iterate never hold the full chunk list.
+
+        Args:
+            text: Text to chunk
+            metadata: Optional metadata to attach to each chunk
+
+        Yields:
+            Chunk dictionaries with text and metadata
+        """
         if not text:
-            return []
+            return
 
         # Clean text
         text = self._clean_text(text)
 
-        # Split into chunks
-        chunks = []
+        # Normalize metadata once; each chunk takes a shallow copy of it
+        base_meta = dict(metadata) if metadata else {}
+        for i, (start, end) in enumerate(self._chunk_spans(text)):
+            meta = base_meta.copy()
+            meta["chunk_index"] = i
+            meta["char_start"] = start
+            meta["char_end"] = end
+            yield {"text": text[start:end], "metadata": meta}
+
+    def _chunk_spans(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) offsets of overlapping chunks in cleaned text."""
+        # Large documents use the compiled boundary scan; small ones are not
+        # worth the array conversion
+        if len(text) > _KERNEL_MIN_CHARS and self.chunk_size > self.chunk_overlap:
+            for start, end in find_boundaries(text, self.chunk_size, self.chunk_overlap).tolist():
+                yield start, end
+            return
+
         start = 0
+        text_len = len(text)
 
-        while start < len(text):
+        while start < text_len:
             end = start + self.chunk_size
 
             # Try to break at sentence boundary
-            if end < len(text):
+            if end < text_len:
                 end = self._find_sentence_boundary(text, end)
 
-            chunk_text = text[start:end]
-            chunk_metadata = {
-                **(metadata or {}),
-                "chunk_index": len(chunks),
-                "char_start": start,
-                "char_end": end,
-            }
-
-            chunks.append({
-                "text": chunk_text,
-                "metadata": chunk_metadata,
-            })
+            yield start, end
 
             # Move start position with overlap
             start = end - self.chunk_overlap
 
-        return chunks
-
     def chunk_by_paragraphs(
         self,
         text: str,
@@ -91,43 +132,49 @@ class TextChunker:
         if not text:
             return []
 
-        # Split by paragraph
-        paragraphs = re.split(r"\n\s*\n", text)
+        # Split by paragraph, keeping each non-empty paragraph's original index
+        parts = _PARA_SPLIT.split(text)
+        indices = []
+        paragraphs = []
+        for i, part in enumerate(parts):
+            para = part.strip()
+            if para:
+                indices.append(i)
+                paragraphs.append(para)
+        lengths = [len(para) for para in paragraphs]
+        base_meta = dict(metadata) if metadata else {}
+
+        # Walk paragraph indices; each chunk is the slice paragraphs[start:j]
         chunks = []
-        current_chunk = []
+        start = 0
         current_size = 0
 
-        for i, para in enumerate(paragraphs):
-            para = para.strip()
-            if not para:
-                continue
-
-            para_size = len(para)
-
+        for j, para_size in enumerate(lengths):
             # If single paragraph exceeds chunk size, split it
             if para_size > self.chunk_size:
-                if current_chunk:
-                    chunks.append(self._create_chunk(current_chunk, metadata, len(chunks)))
-                    current_chunk = []
-                    current_size = 0
+                if start < j:
+                    chunks.append(self._create_chunk(paragraphs[start:j], base_meta, len(chunks)))
 
                 # Split large paragraph
-                sub_chunks = self.chunk_text(para, {**(metadata or {}), "paragraph_index": i})
+                para_meta = base_meta.copy()
+                para_meta["paragraph_index"] = indices[j]
+                sub_chunks = self.chunk_text(paragraphs[j], para_meta)
                 chunks.extend(sub_chunks)
+                start = j + 1
+                current_size = 0
                 continue
 
             # Check if adding this paragraph would exceed limit
-            if current_size + para_size > self.chunk_size and current_chunk:
-                chunks.append(self._create_chunk(current_chunk, metadata, len(chunks)))
-                current_chunk = [para]
+            if current_size + para_size > self.chunk_size and start < j:
+                chunks.append(self._create_chunk(paragraphs[start:j], base_meta, len(chunks)))
+                start = j
                 current_size = para_size
             else:
-                current_chunk.append(para)
                 current_size += para_size + 2  # +2 for newline
 
         # Add remaining chunk
-        if current_chunk:
-            chunks.append(self._create_chunk(current_chunk, metadata, len(chunks)))
+        if start < len(paragraphs):
+            chunks.append(self._create_chunk(paragraphs[start:], base_meta, len(chunks)))
 
         return chunks
 
@@ -150,13 +197,13 @@ class TextChunker:
             return []
 
         # Find all headings (lines that look like headings)
-        heading_pattern = r"^(#{1,6}\s+.+|[A-Z][^\.]+:\s*$|\n[A-Z][^\.]+:\s*$)"
-        matches = list(re.finditer(heading_pattern, text, re.MULTILINE))
+        matches = list(_HEADING.finditer(text))
 
         if not matches:
             # No headings found, fall back to paragraph chunking
             return self.chunk_by_paragraphs(text, metadata)
 
+        base_meta = dict(metadata) if metadata else {}
         chunks = []
         for i, match in enumerate(matches):
             start = match.start()
@@ -164,11 +211,9 @@ class TextChunker:
 
             section_text = text[start:end].strip()
             if section_text:
-                chunk_metadata = {
-                    **(metadata or {}),
-                    "chunk_index": i,
-                    "heading": match.group().strip(),
-                }
+                chunk_metadata = base_meta.copy()
+                chunk_metadata["chunk_index"] = i
+                chunk_metadata["heading"] = match.group().strip()
                 chunks.append({
                     "text": section_text,
                     "metadata": chunk_metadata,
@@ -178,37 +223,30 @@ class TextChunker:
 
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text."""
-        # Replace multiple whitespace with single space
-        text = re.sub(r"\s+", " ", text)
+        # Replace multiple whitespace with single space, skipping the
+        # substitution when every whitespace run is already a single space
+        if _WS_DIRTY.search(text):
+            text = _WS_RE.sub(" ", text)
         # Remove control characters
-        text = re.sub(r"[\x00-\x08\x0b-\x0c\x0e-\x1f\x7f]", "", text)
+        text = text.translate(_CTRL_TRANS)
         return text.strip()
 
     def _find_sentence_boundary(self, text: str, position: int) -> int:
         """Find the nearest sentence boundary after position."""
-        # Look for sentence endings
-        sentence_ends = re.finditer(r"[.!?]\s+", text[position:])
-        try:
-            match = next(sentence_ends)
-            return position + match.end()
-        except StopIteration:
-            return position
+        # Search from position in place rather than on a copied suffix
+        match = _SENT_END.search(text, position)
+        return match.end() if match else position
 
     def _create_chunk(
         self,
         text_parts: List[str],
-        metadata: Optional[Dict[str, Any]],
+        base_meta: Dict[str, Any],
         index: int,
     ) -> Dict[str, Any]:
-        """Create a chunk from text parts."""
-        text = "\n\n".join(text_parts)
-        return {
-            "text": text,
-            "metadata": {
-                **(metadata or {}),
-                "chunk_index": index,
-            },
-        }
+        """Create a chunk from text parts, copying the caller's normalized metadata."""
+        meta = base_meta.copy()
+        meta["chunk_index"] = index
+        return {"text": "\n\n".join(text_parts), "metadata": meta}
 
 
 def chunk_for_rag(
@@ -239,9 +277,9 @@ def chunk_for_rag(
         return chunker.chunk_by_paragraphs(text, metadata)
     else:
         # Auto - detect best strategy
-        if re.search(r"^#{1,6}\s+", text, re.MULTILINE):
+        if _MD_HEADING.search(text):
             return chunker.chunk_by_headings(text, metadata)
-        elif re.search(r"\n\s*\n", text):
+        elif _PARA_SPLIT.search(text):
             return chunker.chunk_by_paragraphs(text, metadata)
         else:
             return chunker.chunk_text(text, metadata)
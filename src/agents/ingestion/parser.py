@@ -3,21 +3,49 @@ PDF and image parser for the ingestion agent.
 """
 
 import logging
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, Any, List, Optional, Tuple
 import fitz  # PyMuPDF
 from PIL import Image
 import io
 
+from src.agents.ingestion._pool import WorkerPool, can_use_pool, default_workers
 from src.agents.state import DocumentType
 
 logger = logging.getLogger(__name__)
 
+# PDFs with at least this many pages are extracted across worker processes
+_PARALLEL_MIN_PAGES = 16
+
+# Every worker receives its own copy of the PDF bytes, so keep the pool small
+_PDF_POOL = WorkerPool(max_workers=default_workers(4))
+
+# (text, tables, images) extracted from one PDF page
+PageContent = Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]]]
+
+
+def _page_ranges(file_bytes: bytes, page_count: int) -> List[Tuple[bytes, int, int]]:
+    """Split pages into one contiguous (file_bytes, start, stop) task per pool worker."""
+    step = -(-page_count // _PDF_POOL.max_workers)  # ceil division
+    return [(file_bytes, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+
+def _extract_text_range(file_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Open the PDF in this process and return the text of pages [start, stop) (runs in pool workers)."""
+    with fitz.open(stream=file_bytes, filetype="pdf") as pdf_doc:
+        return [pdf_doc[n].get_text() for n in range(start, stop)]
+
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int) -> List[PageContent]:
+    """Open the PDF in this process and extract pages [start, stop) (runs in pool workers)."""
+    with fitz.open(stream=file_bytes, filetype="pdf") as pdf_doc:
+        return [_DEFAULT_PARSER._extract_page(pdf_doc[n], n) for n in range(start, stop)]
+
 
 class DocumentParser:
     """Parses PDF and image documents to extract text, tables, and images."""
 
-    def __init__(self):
-        self.supported_image_types = {".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".webp"}
+    supported_image_types = frozenset({".png", ".jpg", ".jpeg", ".tiff", ".bmp", ".webp"})
 
     def parse(self, file_path: str, file_bytes: bytes) -> Dict[str, Any]:
         """
@@ -57,23 +85,32 @@ class DocumentParser:
             "metadata": {},
             "page_count": 0,
         }
+        text_parts: List[str] = []
 
         try:
-            pdf_doc = fitz.open(stream=file_bytes, doc_type="pdf")
+            pdf_doc = fitz.open(stream=file_bytes, filetype="pdf")
             result["page_count"] = len(pdf_doc)
-            result["metadata"] = dict(pdf_doc.metadata)
-
-            for page_num, page in enumerate(pdf_doc):
-                # Extract text
-                text = page.get_text("text")
-                result["text"] += text + "\n\n"
-
-                # Extract tables (basic implementation)
-                tables = self._extract_tables_from_page(page)
+            # PyMuPDF builds this dict once per document and it outlives
+            # close(), so the result can own it without a copy
+            result["metadata"] = pdf_doc.metadata or {}
+
+            # MuPDF is not thread-safe, so large PDFs are split across
+            # processes, each opening its own copy of the document. Daemonic
+            # processes (e.g. Celery prefork workers) cannot start children,
+            # and a broken pool falls back to extracting here.
+            pages = None
+            if len(pdf_doc) >= _PARALLEL_MIN_PAGES and can_use_pool():
+                try:
+                    pages = self._extract_pages_parallel(file_bytes, len(pdf_doc))
+                except BrokenProcessPool:
+                    logger.warning("PDF extraction pool broke; extracting pages in-process")
+            if pages is None:
+                pages = (self._extract_page(page, page_num) for page_num, page in enumerate(pdf_doc))
+
+            for text, tables, images in pages:
+                text_parts.append(text)
+                text_parts.append("\n\n")
                 result["tables"].extend(tables)
-
-                # Extract images
-                images = self._extract_images_from_page(page, page_num)
                 result["images"].extend(images)
 
             pdf_doc.close()
@@ -82,8 +119,44 @@ class DocumentParser:
             logger.error(f"Error parsing PDF: {e}")
             result["error"] = str(e)
 
+        # Join once rather than growing the string page by page
+        result["text"] = "".join(text_parts)
         return result
 
+    def _extract_page(self, page, page_num: int) -> PageContent:
+        """
+        Extract text, tables and images from one PDF page.
+
+        Args:
+            page: PyMuPDF page object
+            page_num: Page number
+
+        Returns:
+            Tuple of (text, tables, images)
+        """
+        return (
+            page.get_text("text"),
+            self._extract_tables_from_page(page),
+            self._extract_images_from_page(page, page_num),
+        )
+
+    def _extract_pages_parallel(self, file_bytes: bytes, page_count: int) -> List[PageContent]:
+        """
+        Extract all pages in contiguous ranges on the process pool.
+
+        Args:
+            file_bytes: PDF file bytes
+            page_count: Number of pages in the PDF
+
+        Returns:
+            Page contents in page order
+
+        Raises:
+            BrokenProcessPool: A worker died mid-extraction
+        """
+        ranges = _PDF_POOL.run(_extract_page_range, _page_ranges(file_bytes, page_count))
+        return [page for page_range in ranges for page in page_range]
+
     def _extract_tables_from_page(self, page) -> List[Dict[str, Any]]:
         """
         Extract tables from a PDF page.
@@ -129,20 +202,18 @@ class DocumentParser:
         images = []
 
         try:
-            image_list = page.get_images(full=True)
-            for img_index, img in enumerate(image_list):
-                xref = img[0]
-                base_image = page.parent.extract_image(xref)
-
+            # Image metadata comes from the page's display list; pixel data is
+            # never decoded or hashed (xrefs=True would force hashing)
+            for info in page.get_image_info(hashes=False):
                 images.append({
                     "page": page_num,
-                    "index": img_index,
-                    "width": base_image["width"],
-                    "height": base_image["height"],
-                    "colorspace": base_image["colorspace"],
-                    "bpc": base_image["bpc"],
-                    "ext": base_image["ext"],
-                    "size": len(base_image["image"]),
+                    "index": info["number"],
+                    "width": info["width"],
+                    "height": info["height"],
+                    "colorspace": info["colorspace"],
+                    "bpc": info["bpc"],
+                    "size": info["size"],
+                    "bbox": info["bbox"],
                 })
         except Exception as e:
             logger.debug(f"Image extraction error: {e}")
@@ -168,18 +239,22 @@ class DocumentParser:
         }
 
         try:
-            image = Image.open(io.BytesIO(file_bytes))
+            # Image.open only reads the header; nothing here touches pixel
+            # data, so the image is never decoded. OCR/vision steps that
+            # need pixels re-open the original bytes.
+            with Image.open(io.BytesIO(file_bytes)) as image:
+                image_format, mode = image.format, image.mode
+                width, height = image.size
             result["metadata"] = {
-                "format": image.format,
-                "mode": image.mode,
-                "width": image.width,
-                "height": image.height,
+                "format": image_format,
+                "mode": mode,
+                "width": width,
+                "height": height,
             }
-            # Store image bytes for OCR/vision processing
             result["images"].append({
-                "width": image.width,
-                "height": image.height,
-                "format": image.format,
+                "width": width,
+                "height": height,
+                "format": image_format,
             })
 
         except Exception as e:
@@ -211,10 +286,17 @@ class DocumentParser:
         }
 
     def _get_extension(self, file_path: str) -> str:
-        """Get file extension from path."""
-        import os
-        _, ext = os.path.splitext(file_path)
-        return ext.lower()
+        """Get file extension from path (same rules as os.path.splitext)."""
+        name = file_path.rpartition("/")[2]
+        stem, _, ext = name.rpartition(".")
+        # No dot, or only leading dots (".bashrc"), means no extension
+        if not stem.strip("."):
+            return ""
+        return "." + ext.lower()
+
+
+# Shared parser for module-level helpers and pool workers
+_DEFAULT_PARSER = DocumentParser()
 
 
 def extract_text_from_file(file_path: str, file_bytes: bytes) -> str:
@@ -228,6 +310,29 @@ def extract_text_from_file(file_path: str, file_bytes: bytes) -> str:
     Returns:
         Extracted text
     """
-    parser = DocumentParser()
-    result = parser.parse(file_path, file_bytes)
+    result = _DEFAULT_PARSER.parse(file_path, file_bytes)
     return result.get("text", "")
+
+
+def extract_pdf_text(file_bytes: bytes) -> str:
+    """
+    Extract the plain text of every PDF page, in page order.
+
+    Skips the table and image passes of DocumentParser.parse. Large PDFs
+    are split across the PDF worker pool in the same way.
+
+    Args:
+        file_bytes: PDF file bytes
+
+    Returns:
+        Concatenated page text
+    """
+    with fitz.open(stream=file_bytes, filetype="pdf") as pdf_doc:
+        page_count = len(pdf_doc)
+        if page_count >= _PARALLEL_MIN_PAGES and can_use_pool():
+            try:
+                ranges = _PDF_POOL.run(_extract_text_range, _page_ranges(file_bytes, page_count))
+                return "".join([text for page_range in ranges for text in page_range])
+            except BrokenProcessPool:
+                logger.warning("PDF extraction pool broke; extracting text in-process")
+        return "".join([page.get_text() for page in pdf_doc])
@@ -71,6 +71,9 @@ class AnalysisResult(TypedDict):
     trends: Dict[str, Any]
 
 
+# AgentState stays a TypedDict rather than a slotted dataclass or struct:
+# LangGraph merges each node's returned updates into the state as a dict,
+# MemorySaver checkpoints it as one, and every node uses item access.
 class AgentState(TypedDict):
     """Main state container for the LangGraph agent workflow."""
 
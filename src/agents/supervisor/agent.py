@@ -26,6 +26,18 @@ from src.agents.state import (
 class SupervisorAgent(BaseAgent):
     """Central orchestrator agent that manages the document processing workflow."""
 
+    # Agent that handles each document type
+    _ROUTING_MAP: Dict[DocumentType, str] = {
+        DocumentType.INVOICE: "extraction",
+        DocumentType.CONTRACT: "extraction",
+        DocumentType.FORM: "extraction",
+        DocumentType.RECEIPT: "extraction",
+        DocumentType.LETTER: "extraction",
+        DocumentType.MEMO: "extraction",
+        DocumentType.REPORT: "analyst",
+        DocumentType.OTHER: "extraction",
+    }
+
     def __init__(
         self,
         confidence_threshold: float = 0.7,
@@ -131,11 +143,9 @@ Always respond with a clear routing decision and reasoning."""
         state["approval_status"] = ApprovalStatus.PENDING
         state["approval_requested_at"] = datetime.utcnow()
 
-        # Build approval context
+        # Build approval context (results stay in state, keyed by document id)
         approval_context = {
             "document_ids": state.get("document_ids", []),
-            "extraction_results": state.get("extraction_results", {}),
-            "analysis_results": state.get("analysis_results"),
             "confidence_scores": self._get_confidence_summary(state),
         }
         state["approval_context"] = approval_context
@@ -156,17 +166,7 @@ Always respond with a clear routing decision and reasoning."""
 
     def route_task(self, document_type: DocumentType) -> str:
         """Determine which agent should handle the document type."""
-        routing_map = {
-            DocumentType.INVOICE: "extraction",
-            DocumentType.CONTRACT: "extraction",
-            DocumentType.FORM: "extraction",
-            DocumentType.RECEIPT: "extraction",
-            DocumentType.LETTER: "extraction",
-            DocumentType.MEMO: "extraction",
-            DocumentType.REPORT: "analyst",
-            DocumentType.OTHER: "extraction",
-        }
-        return routing_map.get(document_type, "extraction")
+        return self._ROUTING_MAP.get(document_type, "extraction")
 
     def should_request_approval(
         self,
@@ -7,6 +7,14 @@ from datetime import datetime
 
 from src.agents.state import AgentState, SupervisorState, ApprovalStatus, AgentType
 
+# Agent that follows each workflow step (None after analysis: approval gate)
+_WORKFLOW_MAP: Dict[Optional[AgentType], Optional[AgentType]] = {
+    None: AgentType.INGESTION,
+    AgentType.INGESTION: AgentType.EXTRACTION,
+    AgentType.EXTRACTION: AgentType.ANALYST,
+    AgentType.ANALYST: None,  # Requires approval
+}
+
 
 def initialize_supervisor_state(
     document_ids: list,
@@ -61,46 +69,40 @@ def handle_approval_result(
     return state
 
 
+def _result_requires_approval(
+    result: Dict[str, Any],
+    confidence_threshold: float,
+    value_threshold: float,
+) -> bool:
+    """Whether one extraction result has low confidence or a high transaction value."""
+    if result.get("confidence", 1.0) < confidence_threshold:
+        return True
+    data = result.get("data", {})
+    total = data.get("total") or data.get("amount") or 0
+    return isinstance(total, (int, float)) and total > value_threshold
+
+
 def check_approval_required(
     state: AgentState,
     confidence_threshold: float = 0.7,
     value_threshold: float = 1000.0,
 ) -> bool:
     """Check if approval is required based on current state."""
-    # Check extraction confidence
-    extraction_results = state.get("extraction_results", {})
-    for doc_id, result in extraction_results.items():
-        confidence = result.get("confidence", 1.0)
-        if confidence < confidence_threshold:
-            return True
-
-    # Check for anomalies
+    # Anomalies need no scan, so check them first
     analysis_results = state.get("analysis_results")
     if analysis_results and analysis_results.get("anomalies"):
         return True
 
-    # Check transaction values
-    for result in extraction_results.values():
-        data = result.get("data", {})
-        total = data.get("total") or data.get("amount") or 0
-        if isinstance(total, (int, float)) and total > value_threshold:
-            return True
-
-    return False
+    # Single pass over the extractions, stopping at the first trigger
+    return any(
+        _result_requires_approval(result, confidence_threshold, value_threshold)
+        for result in state.get("extraction_results", {}).values()
+    )
 
 
 def get_next_agent(state: AgentState) -> Optional[AgentType]:
     """Determine the next agent based on current state and workflow."""
-    current = state.get("current_agent")
-
-    workflow_map = {
-        None: AgentType.INGESTION,
-        AgentType.INGESTION: AgentType.EXTRACTION,
-        AgentType.EXTRACTION: AgentType.ANALYST,
-        AgentType.ANALYST: None,  # Requires approval
-    }
-
-    return workflow_map.get(current)
+    return _WORKFLOW_MAP.get(state.get("current_agent"))
 
 
 def get_workflow_status(state: AgentState) -> Dict[str, Any]:
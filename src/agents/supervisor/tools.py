@@ -2,10 +2,12 @@
 Supervisor agent tools - Functions the supervisor can call.
 """
 
-import json
+import time
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
+
+import orjson
 
 from src.agents.state import DocumentType, ApprovalStatus
 from src.services.storage import StorageService
@@ -14,6 +16,33 @@ from src.models import Document, Approval
 
 logger = logging.getLogger(__name__)
 
+# (epoch second, "YYYY-MM-DDTHH:MM:SS" in UTC) of the last timestamp formatted
+_ts_cache: Tuple[int, str] = (-1, "")
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as ISO 8601 with microseconds, formatting the date and time once per second."""
+    global _ts_cache
+    second, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_second, prefix = _ts_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _ts_cache = (second, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
+
+
+# Agent that handles each document type
+_ROUTING_MAP = {
+    "invoice": "extraction",
+    "contract": "extraction",
+    "form": "extraction",
+    "receipt": "extraction",
+    "letter": "extraction",
+    "memo": "extraction",
+    "report": "analyst",
+    "other": "extraction",
+}
+
 
 async def route_task(
     document_type: str,
@@ -29,17 +58,7 @@ async def route_task(
     Returns:
         The name of the agent to route to
     """
-    routing_map = {
-        "invoice": "extraction",
-        "contract": "extraction",
-        "form": "extraction",
-        "receipt": "extraction",
-        "letter": "extraction",
-        "memo": "extraction",
-        "report": "analyst",
-        "other": "extraction",
-    }
-    return routing_map.get(document_type, "extraction")
+    return _ROUTING_MAP.get(document_type, "extraction")
 
 
 async def request_approval(
@@ -61,7 +80,7 @@ async def request_approval(
     approval_request = {
         "task_id": task_id,
         "status": ApprovalStatus.PENDING,
-        "requested_at": datetime.utcnow().isoformat(),
+        "requested_at": _utc_timestamp(),
         "context": context,
     }
 
@@ -111,12 +130,12 @@ async def log_trace(
         Log entry
     """
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": _utc_timestamp(),
         "event": event,
         "metadata": metadata,
         "trace_id": trace_id,
     }
-    logger.info(f"Trace: {json.dumps(log_entry)}")
+    logger.info(f"Trace: {orjson.dumps(log_entry, option=orjson.OPT_UTC_Z).decode()}")
     return log_entry
 
 
@@ -168,18 +187,21 @@ async def check_document_status(
     return "unknown"
 
 
-def get_supervisor_tools() -> List[Any]:
+_SUPERVISOR_TOOLS = (
+    route_task,
+    request_approval,
+    update_state,
+    log_trace,
+    get_document_metadata,
+    check_document_status,
+)
+
+
+def get_supervisor_tools() -> Tuple[Any, ...]:
     """
-    Return list of tools available to the supervisor agent.
+    Return the tools available to the supervisor agent.
 
     Returns:
-        List of tool functions
+        Tool functions (shared, so returned as a tuple)
     """
-    return [
-        route_task,
-        request_approval,
-        update_state,
-        log_trace,
-        get_document_metadata,
-        check_document_status,
-    ]
+    return _SUPERVISOR_TOOLS
@@ -2,16 +2,27 @@
 LangGraph-based document processing workflow with LangSmith tracing.
 """
 
+import asyncio
 import uuid
 import logging
+import weakref
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
 
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
-from langsmith import traceable
 
+from src.agents.analyst.anomaly import (
+    detect_price_spikes,
+    detect_duplicate_charges,
+    detect_tax_anomalies,
+)
+from src.agents.analyst.columns import InvoiceColumns
+from src.agents.extraction.vision import LLMExtractor, calculate_extraction_confidence
+from src.agents.ingestion.classifier import DocumentClassifier
+from src.agents.ingestion.parser import extract_pdf_text
 from src.agents.state import (
     AgentState,
     AgentType,
@@ -21,7 +32,7 @@ from src.agents.state import (
     ApprovalStatus,
 )
 from src.utils.config import get_settings
-from src.utils.observability import setup_langsmith_tracing
+from src.utils.observability import setup_langsmith_tracing, traced
 from src.services.database import DatabaseService
 from src.services.storage import StorageService
 
@@ -40,6 +51,69 @@ class ProcessingStep(str, Enum):
     ERROR = "error"
 
 
+# One DatabaseService per event loop: asyncpg connections belong to the loop
+# that opened them, and run_document_workflow starts a fresh loop per run
+_db_services: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, DatabaseService]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _db() -> DatabaseService:
+    """Get the database service for the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    db = _db_services.get(loop)
+    if db is None:
+        db = _db_services[loop] = DatabaseService(get_settings().database_url)
+    return db
+
+
+@lru_cache(maxsize=1)
+def _storage() -> StorageService:
+    """Get the shared storage service (the MinIO client is thread-safe)."""
+    settings = get_settings()
+    return StorageService(
+        endpoint=settings.minio_endpoint,
+        access_key=settings.minio_access_key,
+        secret_key=settings.minio_secret_key,
+        bucket=settings.minio_bucket
+    )
+
+
+@lru_cache(maxsize=1)
+def _classifier() -> DocumentClassifier:
+    """Get the shared document classifier."""
+    return DocumentClassifier()
+
+
+@lru_cache(maxsize=1)
+def _extractor() -> LLMExtractor:
+    """Get the shared extractor, configuring the Gemini model and prompts once."""
+    return LLMExtractor()
+
+
+def _trace_state_summary(state: AgentState) -> Dict[str, Any]:
+    """Summarize a workflow state for traces, leaving out document text and extracted data."""
+    document_id = state.get("current_document_id")
+    ingestion_result = state.get("ingestion_results", {}).get(document_id, {})
+    return {
+        "document_id": document_id,
+        "trace_id": state.get("trace_id"),
+        "document_status": state.get("document_status"),
+        "content_len": len(ingestion_result.get("content", "")),
+        "errors": state.get("errors", []),
+    }
+
+
+def _trace_node_inputs(inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Trace a node's state argument as a summary."""
+    return _trace_state_summary(inputs["state"])
+
+
+def _traced_step(name: str):
+    """Trace a workflow node with state summaries instead of the full state."""
+    return traced(name, process_inputs=_trace_node_inputs, process_outputs=_trace_state_summary)
+
+
 def create_initial_state(document_id: str, trace_id: Optional[str] = None) -> AgentState:
     return {
         "document_ids": [document_id],
@@ -59,30 +133,20 @@ def create_initial_state(document_id: str, trace_id: Optional[str] = None) -> Ag
     }
 
 
-@traceable(name="step:ingest_document", run_id=None)
-def ingest_document_node(state: AgentState) -> AgentState:
+@_traced_step("step:ingest_document")
+async def ingest_document_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
     logger.info(f"[{trace_id}] Starting ingestion for document {document_id}")
 
     try:
-        settings = get_settings()
-        db = DatabaseService(settings.database_url)
-        storage = StorageService(
-            endpoint=settings.minio_endpoint,
-            access_key=settings.minio_access_key,
-            secret_key=settings.minio_secret_key,
-            bucket=settings.minio_bucket
-        )
+        db = _db()
+        storage = _storage()
 
         state["document_status"] = DocumentStatus.INGESTING
 
-        import asyncio
-        async def _get_document():
-            return await db.get_document(document_id)
-
-        document = asyncio.run(_get_document())
+        document = await db.get_document(document_id)
 
         if not document:
             state["errors"].append(f"Document {document_id} not found")
@@ -90,7 +154,8 @@ def ingest_document_node(state: AgentState) -> AgentState:
             return state
 
         try:
-            file_bytes = storage.download_file(document.minio_key)
+            # The MinIO client is blocking, so keep it off the event loop
+            file_bytes = await asyncio.to_thread(storage.download_file, document.minio_key)
         except Exception as e:
             state["errors"].append(f"Failed to download file: {str(e)}")
             state["document_status"] = DocumentStatus.FAILED
@@ -98,11 +163,9 @@ def ingest_document_node(state: AgentState) -> AgentState:
 
         text_content = ""
         try:
-            import fitz
-            doc = fitz.open(stream=file_bytes, filetype="pdf")
-            for page in doc:
-                text_content += page.get_text()
-            doc.close()
+            # Large PDFs fan out to the parser's worker pool; either way the
+            # page walk runs off the event loop
+            text_content = await asyncio.to_thread(extract_pdf_text, file_bytes)
         except Exception as e:
             logger.warning(f"[{trace_id}] Could not extract text: {e}")
             text_content = f"[Text extraction failed: {str(e)}]"
@@ -129,17 +192,15 @@ def ingest_document_node(state: AgentState) -> AgentState:
         return state
 
 
-@traceable(name="step:classify_document", run_id=None)
-def classify_document_node(state: AgentState) -> AgentState:
+@_traced_step("step:classify_document")
+async def classify_document_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
     logger.info(f"[{trace_id}] Starting classification for document {document_id}")
 
     try:
-        from src.agents.ingestion.classifier import DocumentClassifier
-
-        classifier = DocumentClassifier()
+        classifier = _classifier()
         ingestion_result = state["ingestion_results"].get(document_id, {})
         content = ingestion_result.get("content", "")
         filename = ingestion_result.get("metadata", {}).get("filename", "")
@@ -160,16 +221,14 @@ def classify_document_node(state: AgentState) -> AgentState:
         return state
 
 
-@traceable(name="step:extract_data", run_id=None)
-def extract_data_node(state: AgentState) -> AgentState:
+@_traced_step("step:extract_data")
+async def extract_data_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
     logger.info(f"[{trace_id}] Starting extraction for document {document_id}")
 
     try:
-        from src.agents.extraction.vision import LLMExtractor
-
         state["document_status"] = DocumentStatus.EXTRACTING
 
         ingestion_result = state["ingestion_results"].get(document_id, {})
@@ -181,8 +240,8 @@ def extract_data_node(state: AgentState) -> AgentState:
 
         doc_type_str = doc_type.value if isinstance(doc_type, DocumentType) else "other"
 
-        extractor = LLMExtractor()
-        extracted_data = extractor.extract(content, doc_type_str)
+        extractor = _extractor()
+        extracted_data = await asyncio.to_thread(extractor.extract, content, doc_type_str)
 
         if "error" in extracted_data:
             extracted_data = {
@@ -195,7 +254,6 @@ def extract_data_node(state: AgentState) -> AgentState:
                 ]
             }
 
-        from src.agents.extraction.vision import calculate_extraction_confidence
         confidence = calculate_extraction_confidence(extracted_data, doc_type_str)
 
         extraction_result: ExtractionResult = {
@@ -218,53 +276,38 @@ def extract_data_node(state: AgentState) -> AgentState:
         return state
 
 
-@traceable(name="step:detect_anomalies", run_id=None)
-def detect_anomalies_node(state: AgentState) -> AgentState:
+@_traced_step("step:detect_anomalies")
+async def detect_anomalies_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
     logger.info(f"[{trace_id}] Starting anomaly detection for document {document_id}")
 
     try:
-        from src.agents.analyst.anomaly import (
-            detect_price_spikes,
-            detect_duplicate_charges,
-            detect_tax_anomalies,
-        )
-
         state["document_status"] = DocumentStatus.ANALYZING
 
         extraction_result = state["extraction_results"].get(document_id, {})
         extracted_data = extraction_result.get("data", {})
 
-        settings = get_settings()
-        db = DatabaseService(settings.database_url)
-
-        import asyncio
-        async def _get_comparisons():
-            return await db.list_all_extractions()
-
-        all_extractions = asyncio.run(_get_comparisons())
-
-        all_invoices = []
-        for ext in all_extractions:
-            if ext.data and isinstance(ext.data, dict) and ext.document_id != document_id:
-                all_invoices.append(ext.data)
+        all_invoices = await _db().list_comparison_data(document_id)
 
         if extracted_data:
             all_invoices.append(extracted_data)
 
-        anomalies = []
+        columns = InvoiceColumns.from_dicts(all_invoices)
 
+        detectors = []
         if len(all_invoices) >= 2:
-            price_spikes = detect_price_spikes(all_invoices, threshold_percent=50.0)
-            anomalies.extend([a.to_dict() for a in price_spikes])
+            detectors.append(asyncio.to_thread(
+                detect_price_spikes, all_invoices, threshold_percent=50.0, columns=columns
+            ))
+        detectors.append(asyncio.to_thread(detect_duplicate_charges, all_invoices, columns=columns))
+        detectors.append(asyncio.to_thread(detect_tax_anomalies, all_invoices, columns=columns))
 
-        duplicates = detect_duplicate_charges(all_invoices)
-        anomalies.extend([a.to_dict() for a in duplicates])
-
-        tax_anomalies = detect_tax_anomalies(all_invoices)
-        anomalies.extend([a.to_dict() for a in tax_anomalies])
+        # Detectors only read the shared inputs and the compiled kernels
+        # release the GIL, so they overlap off the event loop
+        results = await asyncio.gather(*detectors)
+        anomalies = [a.to_dict() for found in results for a in found]
 
         state["analysis_results"] = {
             "summary": f"Analyzed document. Found {len(anomalies)} anomalies.",
@@ -290,8 +333,8 @@ def detect_anomalies_node(state: AgentState) -> AgentState:
         return state
 
 
-@traceable(name="step:check_approval", run_id=None)
-def check_approval_node(state: AgentState) -> AgentState:
+@_traced_step("step:check_approval")
+async def check_approval_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
@@ -323,10 +366,11 @@ def check_approval_node(state: AgentState) -> AgentState:
             needs_approval = True
             reasons.append(f"High value: ${transaction_value} > ${value_threshold}")
 
+        # Results are referenced by document id; readers take them from
+        # state["extraction_results"] / state["analysis_results"], so each
+        # checkpoint stores them once
         state["approval_context"] = {
             "document_ids": [document_id],
-            "extraction_results": {document_id: extraction_result},
-            "analysis_results": state["analysis_results"],
             "confidence_scores": {document_id: confidence},
             "reasons": reasons,
             "needs_approval": needs_approval,
@@ -346,8 +390,8 @@ def check_approval_node(state: AgentState) -> AgentState:
         return state
 
 
-@traceable(name="step:complete_processing", run_id=None)
-def complete_node(state: AgentState) -> AgentState:
+@_traced_step("step:complete_processing")
+async def complete_node(state: AgentState) -> AgentState:
     document_id = state["current_document_id"]
     trace_id = state["trace_id"]
 
@@ -391,13 +435,8 @@ def create_processing_graph() -> StateGraph:
     graph.add_edge("extract", "detect_anomalies")
     graph.add_edge("detect_anomalies", "check_approval")
 
-    graph.add_conditional_edges(
-        "check_approval",
-        lambda state: "complete" if state.get("approval_context", {}).get("needs_approval", False) else "complete",
-        {
-            "complete": "complete",
-        }
-    )
+    # complete_node applies the approval outcome, so every run goes there
+    graph.add_edge("check_approval", "complete")
 
     graph.add_edge("complete", END)
     graph.add_edge("error", END)
@@ -406,6 +445,11 @@ def create_processing_graph() -> StateGraph:
 
 
 _processing_graph = None
+_compiled_graph = None
+
+# Shared by every run; each run checkpoints to its own thread and drops it
+# when done, so finished workflows do not accumulate in memory
+_checkpointer = MemorySaver()
 
 
 def get_processing_graph() -> StateGraph:
@@ -415,30 +459,48 @@ def get_processing_graph() -> StateGraph:
     return _processing_graph
 
 
-@traceable(name="Document Analysis", run_id=None)
+def get_compiled_graph():
+    """Get the processing graph compiled once with the shared checkpointer."""
+    global _compiled_graph
+    if _compiled_graph is None:
+        _compiled_graph = get_processing_graph().compile(checkpointer=_checkpointer)
+    return _compiled_graph
+
+
 def run_document_workflow(document_id: str, trace_id: Optional[str] = None) -> AgentState:
+    """Run the workflow to completion from synchronous code (e.g. background tasks)."""
+    return asyncio.run(run_document_workflow_async(document_id, trace_id))
+
+
+async def run_document_workflow_async(document_id: str, trace_id: Optional[str] = None) -> AgentState:
+    # Configure tracing before the root span decides whether to record
     setup_langsmith_tracing()
+    return await _run_document_workflow(document_id, trace_id)
+
 
+@traced("Document Analysis", sampled=True, process_outputs=_trace_state_summary)
+async def _run_document_workflow(document_id: str, trace_id: Optional[str] = None) -> AgentState:
     if not trace_id:
         trace_id = str(uuid.uuid4())
 
     logger.info(f"Starting document workflow for {document_id} with trace {trace_id}")
 
     initial_state = create_initial_state(document_id, trace_id)
-    graph = get_processing_graph()
+    compiled_graph = get_compiled_graph()
 
-    checkpointer = MemorySaver()
-    compiled_graph = graph.compile(checkpointer=checkpointer)
+    # Unique per run, so concurrent runs for one document never share a thread
+    thread_id = f"doc-{document_id}-{trace_id}"
 
     try:
         config = {
             "configurable": {
-                "thread_id": f"doc-{document_id}",
+                "thread_id": thread_id,
             },
             "recursion_limit": 50,
         }
 
-        final_state = compiled_graph.invoke(initial_state, config)
+        # Nodes are coroutines, so the whole graph runs on the caller's loop
+        final_state = await compiled_graph.ainvoke(initial_state, config)
         return final_state
 
     except Exception as e:
@@ -447,12 +509,8 @@ def run_document_workflow(document_id: str, trace_id: Optional[str] = None) -> A
         initial_state["document_status"] = DocumentStatus.FAILED
         return initial_state
 
-
-async def run_document_workflow_async(document_id: str, trace_id: Optional[str] = None) -> AgentState:
-    import asyncio
-    loop = asyncio.get_event_loop()
-    result = await loop.run_in_executor(None, run_document_workflow, document_id, trace_id)
-    return result
+    finally:
+        await _checkpointer.adelete_thread(thread_id)
 
 
 def get_workflow_status(state: AgentState) -> Dict[str, Any]:
@@ -471,6 +529,7 @@ def get_workflow_status(state: AgentState) -> Dict[str, Any]:
 __all__ = [
     "create_initial_state",
     "create_processing_graph",
+    "get_compiled_graph",
     "run_document_workflow",
     "run_document_workflow_async",
     "get_workflow_status",
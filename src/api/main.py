@@ -27,6 +27,12 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("LangSmith tracing not configured (missing LANGCHAIN_API_KEY or LANGCHAIN_TRACING_V2)")
 
+    # Compile Numba kernels before the first request needs them
+    from src.agents.analyst._kernels import warmup
+    from src.agents.ingestion._chunk_kernel import warmup as warmup_chunker
+    warmup()
+    warmup_chunker()
+
     yield
     # Shutdown
     logger.info("Shutting down DocOps Agent API...")
@@ -88,6 +88,7 @@ async def get_analysis_by_document(document_id: str) -> AnalysisResponse:
                 detect_tax_anomalies,
                 detect_unusual_patterns,
             )
+            from src.agents.analyst.columns import InvoiceColumns
 
             # Get all extractions for comparison (includes current invoice)
             all_extractions = await db.list_all_extractions()
@@ -103,21 +104,24 @@ async def get_analysis_by_document(document_id: str) -> AnalysisResponse:
                         # Use the current extraction data
                         all_invoices.append(extracted_data)
 
+            # Coerce invoice fields once and share them across detectors
+            columns = InvoiceColumns.from_dicts(all_invoices)
+
             # Price spike detection - needs all invoices to compare
             if len(all_invoices) >= 2:
-                price_spikes = detect_price_spikes(all_invoices, threshold_percent=50.0)
+                price_spikes = detect_price_spikes(all_invoices, threshold_percent=50.0, columns=columns)
                 anomalies.extend([a.to_dict() for a in price_spikes])
 
             # Duplicate detection
-            duplicates = detect_duplicate_charges(all_invoices)
+            duplicates = detect_duplicate_charges(all_invoices, columns=columns)
             anomalies.extend([a.to_dict() for a in duplicates])
 
             # Tax anomaly detection
-            tax_anomalies = detect_tax_anomalies(all_invoices)
+            tax_anomalies = detect_tax_anomalies(all_invoices, columns=columns)
             anomalies.extend([a.to_dict() for a in tax_anomalies])
 
             # Unusual patterns
-            patterns = detect_unusual_patterns(all_invoices)
+            patterns = detect_unusual_patterns(all_invoices, columns=columns)
             anomalies.extend([a.to_dict() for a in patterns])
 
             logger.info(f"Analysis complete for document {document_id}. Found {len(anomalies)} anomalies")
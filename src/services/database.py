@@ -182,6 +182,18 @@ class DatabaseService:
             result = await session.execute(query)
             return list(result.scalars().all())
 
+    async def list_comparison_data(self, exclude_document_id: str) -> list[dict]:
+        """List the extracted data of every other document (for anomaly detection)."""
+        async with self.async_session() as session:
+            # Only the data column, filtered in SQL, instead of whole rows
+            query = (
+                select(Extraction.data)
+                .where(Extraction.document_id != exclude_document_id)
+                .order_by(Extraction.created_at.desc())
+            )
+            result = await session.execute(query)
+            return [data for data in result.scalars() if data and isinstance(data, dict)]
+
     # Approval operations
     async def create_approval(
         self,
@@ -3,6 +3,7 @@ Celery configuration for async task processing.
 """
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init
 
 
 def get_settings():
@@ -54,3 +55,12 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(hour=2, minute=0),
     },
 }
+
+
+@worker_process_init.connect
+def warmup_kernels(**kwargs):
+    """Compile Numba kernels in each worker process before it takes tasks."""
+    from src.agents.analyst._kernels import warmup
+    from src.agents.ingestion._chunk_kernel import warmup as warmup_chunker
+    warmup()
+    warmup_chunker()
@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     langchain_tracing_v2: bool = False
     langsmith_api_key: str = ""
     langsmith_project: str = "docops-agent"
+    # Fraction of workflow runs traced when tracing is on (TRACE_SAMPLE_RATE)
+    trace_sample_rate: float = 1.0
 
     # Field aliases for compatibility
     def __init__(self, **kwargs):
@@ -4,16 +4,26 @@ Provides LangSmith integration and latency tracking.
 """
 import os
 import time
+import random
+import inspect
 import logging
 import functools
 from typing import Optional, Callable, Any
 from datetime import datetime
 from contextlib import contextmanager
 
+from langsmith import traceable, tracing_context
+from langsmith.run_trees import get_cached_client
+from langsmith.utils import tracing_is_enabled
+
 from src.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Longest string sent to LangSmith as-is; longer ones (document text) are
+# replaced with a length marker
+_TRACE_MAX_CHARS = 2000
+
 
 class LatencyTracker:
     """Track latency for operations."""
@@ -55,10 +65,28 @@ class LatencyTracker:
         self.measurements = []
 
 
+def _truncate_trace_payload(payload: Any) -> Any:
+    """Copy a trace payload, replacing strings over _TRACE_MAX_CHARS with a length marker."""
+    if isinstance(payload, str):
+        return payload if len(payload) <= _TRACE_MAX_CHARS else f"<{len(payload)} chars>"
+    if isinstance(payload, dict):
+        return {key: _truncate_trace_payload(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        return [_truncate_trace_payload(value) for value in payload]
+    return payload
+
+
+@functools.lru_cache(maxsize=1)
 def setup_langsmith_tracing():
     """
     Set up LangSmith tracing via environment variables.
 
+    Runs once per process; later calls return the first result. When tracing
+    is on, the shared LangSmith client is created here so its background
+    batching thread is running before the first span. Spans are then only
+    queued on the calling thread, and serialization and upload happen in
+    batches off the request path.
+
     Returns:
         True if tracing is configured, False otherwise
     """
@@ -78,10 +106,65 @@ def setup_langsmith_tracing():
     os.environ["LANGCHAIN_API_KEY"] = api_key
     os.environ["LANGCHAIN_PROJECT"] = settings.langsmith_project
 
+    # Same cached client @traceable and LangGraph's tracer use; auto batch
+    # tracing is on by default. LangGraph traces each node with the full
+    # state, so large strings are cut from every run's inputs and outputs.
+    get_cached_client(hide_inputs=_truncate_trace_payload, hide_outputs=_truncate_trace_payload)
+
     logger.info("LangSmith tracing configured successfully")
     return True
 
 
+def _sample_trace() -> bool:
+    """Decide whether a new trace is recorded, per the configured sample rate."""
+    rate = get_settings().trace_sample_rate
+    return rate >= 1.0 or random.random() < rate
+
+
+def traced(name: str, sampled: bool = False, **traceable_kwargs):
+    """
+    Decorator for LangSmith tracing that costs nothing while tracing is off.
+
+    Unlike a bare @traceable, calls go straight to the undecorated function
+    unless tracing is enabled for the current context, so no run tree or
+    input snapshot is built. With sampled=True the decorated function starts
+    a trace and only a trace_sample_rate fraction of its calls is recorded;
+    traced calls nested inside an unsampled one are skipped with it.
+
+    Args:
+        name: Run name shown in LangSmith
+        sampled: Apply head sampling at this function
+        **traceable_kwargs: Passed to traceable (e.g. process_inputs)
+
+    Returns:
+        Decorator for sync or async functions
+    """
+    def decorator(func: Callable) -> Callable:
+        traced_func = traceable(name=name, **traceable_kwargs)(func)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not tracing_is_enabled():
+                    return await func(*args, **kwargs)
+                if sampled and not _sample_trace():
+                    with tracing_context(enabled=False):
+                        return await func(*args, **kwargs)
+                return await traced_func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracing_is_enabled():
+                return func(*args, **kwargs)
+            if sampled and not _sample_trace():
+                with tracing_context(enabled=False):
+                    return func(*args, **kwargs)
+            return traced_func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
 def with_latency_tracking(operation_name: str):
     """
     Decorator to track latency for an operation.
@@ -112,6 +195,7 @@ latency_tracker = LatencyTracker()
 
 __all__ = [
     "setup_langsmith_tracing",
+    "traced",
     "with_latency_tracking",
     "LatencyTracker",
     "latency_tracker",
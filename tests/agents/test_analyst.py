@@ -0,0 +1,413 @@
+"""
+Tests for the analyst agent.
+"""
+
+import pytest
+import numpy as np
+from datetime import date
+from src.agents.analyst.agent import AnalystAgent
+from src.agents.analyst.anomaly import (
+    detect_price_spikes,
+    detect_duplicate_charges,
+    detect_tax_anomalies,
+    detect_all_anomalies,
+)
+from src.agents.analyst.columns import InvoiceColumns
+from src.agents.analyst.comparison import (
+    compare_invoices,
+    compare_vendor_pricing,
+    detect_pricing_trends,
+)
+from src.agents.analyst.metrics import (
+    calculate_invoice_metrics,
+    calculate_monthly_metrics,
+    calculate_vendor_metrics,
+    calculate_category_breakdown,
+    top_categories,
+)
+from src.agents.analyst.trends import (
+    analyze_spending_trends,
+    analyze_vendor_trends,
+    forecast_next_period,
+)
+from src.api.models.analysis import AnomalyType
+
+
+class TestInvoiceColumns:
+    """Test cases for the columnar invoice view."""
+
+    def test_from_dicts(self):
+        """Test columns are aligned with the input invoices."""
+        invoices = [
+            {"document_id": "doc-1", "vendor_name": "ABC Corp", "total": "10.50", "invoice_date": "2024-01-15"},
+            {"vendor_name": "XYZ Inc", "total": None, "invoice_date": date(2024, 2, 1)},
+            {"document_id": "doc-3", "vendor_name": "ABC Corp", "subtotal": 5},
+            {"document_id": "doc-4", "total": 7.0},
+        ]
+
+        columns = InvoiceColumns.from_dicts(invoices)
+
+        assert len(columns) == 4
+        assert columns.doc_ids == ["doc-1", "doc_1", "doc-3", "doc-4"]
+        assert columns.vendor_names.tolist() == ["ABC Corp", "XYZ Inc", "Unknown"]
+        assert columns.vendor_idx.tolist() == [0, 1, 0, 2]
+        assert columns.has_vendor.tolist() == [True, True, True, False]
+        assert columns.total[0] == pytest.approx(10.5)
+        assert np.isnan(columns.total[1])
+        assert columns.subtotal[2] == 5.0
+        assert columns.has_date.tolist() == [True, True, False, False]
+        assert [str(m) for m in columns.months[columns.has_date]] == ["2024-01", "2024-02"]
+
+
+class TestPriceSpikes:
+    """Test cases for price spike detection."""
+
+    def test_detects_spike_above_vendor_average(self):
+        """Test that an invoice well above the vendor average is flagged."""
+        invoices = [
+            {"document_id": "doc-1", "vendor_name": "ABC Corp", "total": 100.0},
+            {"document_id": "doc-2", "vendor_name": "ABC Corp", "total": "100.00"},
+            {"document_id": "doc-3", "vendor_name": "ABC Corp", "total": 400.0},
+            {"document_id": "doc-4", "vendor_name": "XYZ Inc", "total": 50.0},
+        ]
+
+        anomalies = detect_price_spikes(invoices, threshold_percent=50.0)
+
+        assert len(anomalies) == 1
+        assert anomalies[0].anomaly_type == AnomalyType.PRICE_SPIKE
+        assert anomalies[0].document_ids == ["doc-3"]
+        assert anomalies[0].details["vendor"] == "ABC Corp"
+        assert anomalies[0].details["vendor_average"] == pytest.approx(200.0)
+        assert anomalies[0].details["percent_above"] == pytest.approx(100.0)
+
+    def test_single_invoice_vendor_not_flagged(self):
+        """Test that vendors with a single invoice are never flagged."""
+        invoices = [{"document_id": "doc-1", "vendor_name": "ABC Corp", "total": 1000.0}]
+
+        assert detect_price_spikes(invoices) == []
+
+    def test_empty_input(self):
+        """Test that no invoices yields no anomalies."""
+        assert detect_price_spikes([]) == []
+
+
+class TestAllAnomalies:
+    """Test cases for the combined anomaly sweep."""
+
+    def test_results_keep_detector_order(self):
+        """Test anomalies are grouped by detector in a fixed order."""
+        invoices = [
+            {"document_id": "doc-1", "vendor_name": "ABC Corp", "total": 100.0,
+             "invoice_date": "2024-01-01", "line_items": [{}]},
+            {"document_id": "doc-2", "vendor_name": "ABC Corp", "total": 100.0,
+             "invoice_date": "2024-01-02", "line_items": [{}]},
+            {"document_id": "doc-3", "vendor_name": "ABC Corp", "total": 400.0,
+             "subtotal": 300.0, "tax": 30.0, "invoice_date": "2024-01-03", "line_items": [{}]},
+            {"document_id": "doc-4", "vendor_name": "XY", "line_items": [{}]},
+        ]
+
+        anomalies = detect_all_anomalies(invoices)
+
+        assert [a.anomaly_type for a in anomalies] == [
+            AnomalyType.PRICE_SPIKE,
+            AnomalyType.DUPLICATE_CHARGE,
+            AnomalyType.TAX_ANOMALY,
+            AnomalyType.UNUSUAL_PATTERN,
+        ]
+
+
+class TestCompareInvoices:
+    """Test cases for invoice comparison."""
+
+    def test_shared_vendors_and_counts(self):
+        """Test that vendors appearing more than once are reported as shared."""
+        invoices = [
+            {"document_id": "doc-1", "vendor_name": "ABC Corp", "total": 100.0},
+            {"document_id": "doc-2", "vendor_name": "ABC Corp", "total": 200.0},
+            {"document_id": "doc-3", "vendor_name": "XYZ Inc", "total": 300.0},
+            {"document_id": "doc-4", "total": 400.0},
+        ]
+
+        result = compare_invoices(invoices)
+
+        assert result.shared_vendors == ["ABC Corp"]
+        assert result.similarities["vendor_count"] == 2
+        assert result.differences["total_value"] == pytest.approx(1000.0)
+
+    def test_pricing_trends_use_first_and_last_by_date(self):
+        """Test vendor trends compare the earliest and latest invoices."""
+        invoices = [
+            {"vendor_name": "ABC Corp", "invoice_date": "2024-03-01", "total": 150.0},
+            {"vendor_name": "ABC Corp", "invoice_date": "2024-01-01", "total": 100.0},
+            {"vendor_name": "ABC Corp", "invoice_date": "2024-02-01", "total": 500.0},
+            {"vendor_name": "XYZ Inc", "invoice_date": "2024-01-01", "total": 80.0},
+            {"vendor_name": "XYZ Inc", "total": 90.0},
+        ]
+
+        result = detect_pricing_trends(invoices)
+
+        assert result["dated_invoices"] == 4
+        assert list(result["trends"]) == ["ABC Corp"]
+        trend = result["trends"]["ABC Corp"]
+        assert trend["first_invoice"] == 100.0
+        assert trend["last_invoice"] == 150.0
+        assert trend["change_percent"] == pytest.approx(50.0)
+        assert trend["trend"] == "increasing"
+
+    def test_vendor_pricing_matches_case_insensitively(self):
+        """Test vendor pricing selects the vendor's invoices regardless of case."""
+        invoices = [
+            {"vendor_name": "ABC Corp", "total": "100", "line_items": [{"description": "Widget", "unit_price": 10}]},
+            {"vendor_name": "XYZ Inc", "total": 999.0},
+            {"vendor_name": "abc corp", "total": 300.0, "line_items": [{"description": "Widget", "unit_price": "12"}]},
+            {"vendor_name": "ABC Corp", "total": None},
+        ]
+
+        result = compare_vendor_pricing(invoices, "ABC CORP")
+
+        assert result["invoice_count"] == 3
+        assert result["total_spent"] == pytest.approx(400.0)
+        assert result["average_invoice"] == pytest.approx(200.0)
+        assert result["price_range"] == {"min": 100.0, "max": 300.0}
+        assert result["line_item_prices"]["Widget"] == {"min": 10, "max": 12.0, "avg": 11.0}
+        assert "error" in compare_vendor_pricing(invoices, "Missing Co")
+
+
+class TestSpendingTrends:
+    """Test cases for spending trend analysis."""
+
+    def test_monthly_buckets(self):
+        """Test totals are bucketed by month and compared first to last."""
+        invoices = [
+            {"invoice_date": date(2024, 3, 5), "total": 300.0},
+            {"invoice_date": date(2024, 1, 10), "total": "100"},
+            {"invoice_date": date(2024, 1, 20), "total": 50.0},
+            {"invoice_date": date(2024, 2, 1), "total": None},
+            {"total": 999.0},
+        ]
+
+        report = analyze_spending_trends(invoices)
+
+        assert report.data_points == 3
+        assert report.period_start == date(2024, 1, 10)
+        assert report.period_end == date(2024, 3, 5)
+        assert report.trends["monthly_totals"] == {"2024-01": 150.0, "2024-03": 300.0}
+        assert report.trends["total_spent"] == pytest.approx(450.0)
+        assert report.trends["average_monthly"] == pytest.approx(225.0)
+        assert report.trends["overall_change_percent"] == pytest.approx(100.0)
+
+    def test_no_dated_invoices(self):
+        """Test an empty report when nothing is dated."""
+        report = analyze_spending_trends([{"total": 10.0}])
+
+        assert report.data_points == 0
+        assert report.trends == {}
+
+    def test_vendor_trends_first_and_last_by_date(self):
+        """Test vendor trends use the earliest and latest dated invoices."""
+        invoices = [
+            {"vendor_name": "ABC Corp", "invoice_date": date(2024, 3, 1), "total": 150.0},
+            {"vendor_name": "ABC Corp", "invoice_date": date(2024, 1, 1), "total": 100.0},
+            {"vendor_name": "ABC Corp", "invoice_date": date(2024, 2, 1), "total": 500.0},
+            {"vendor_name": "XYZ Inc", "invoice_date": date(2024, 1, 1), "total": 80.0},
+            {"vendor_name": "XYZ Inc", "total": 90.0},
+        ]
+
+        result = analyze_vendor_trends(invoices)
+
+        assert result["total_vendors"] == 2
+        assert list(result["vendor_trends"]) == ["ABC Corp"]
+        trend = result["vendor_trends"]["ABC Corp"]
+        assert trend["invoice_count"] == 3
+        assert trend["total_spent"] == pytest.approx(750.0)
+        assert trend["first_invoice_total"] == 100.0
+        assert trend["last_invoice_total"] == 150.0
+        assert trend["change_percent"] == pytest.approx(50.0)
+
+    def test_linear_forecast(self):
+        """Test the linear forecast extrapolates the least-squares line."""
+        assert forecast_next_period([1.0, 2.0, 3.5, 4.0]) == pytest.approx(5.25)
+        assert forecast_next_period([7.0]) == 7.0
+        assert forecast_next_period([]) == 0.0
+
+    def test_moving_average_forecast(self):
+        """Test the moving average uses the last three values."""
+        assert forecast_next_period([100.0, 1.0, 2.0, 6.0], method="moving_average") == pytest.approx(3.0)
+        assert forecast_next_period(np.array([4.0, 8.0]), method="moving_average") == pytest.approx(6.0)
+
+
+class TestInvoiceMetrics:
+    """Test cases for invoice metrics."""
+
+    def test_metrics_values(self):
+        """Test aggregate metrics over invoice totals."""
+        invoices = [
+            {"total": 100.0},
+            {"total": "200.00"},
+            {"total": 600.0},
+            {"total": None},
+        ]
+
+        metrics = calculate_invoice_metrics(invoices)
+
+        assert metrics.total_documents == 4
+        assert metrics.total_value == pytest.approx(900.0)
+        assert metrics.average_value == pytest.approx(300.0)
+        assert metrics.median_value == pytest.approx(200.0)
+        assert metrics.min_value == pytest.approx(100.0)
+        assert metrics.max_value == pytest.approx(600.0)
+        assert metrics.standard_deviation == pytest.approx(264.575, rel=1e-4)
+
+    def test_monthly_metrics(self):
+        """Test metrics are grouped by invoice month."""
+        invoices = [
+            {"total": 100.0, "invoice_date": date(2024, 1, 5)},
+            {"total": 50.0, "invoice_date": date(2024, 2, 5)},
+            {"total": 150.0, "invoice_date": date(2024, 1, 20)},
+            {"total": 75.0},
+        ]
+
+        monthly = calculate_monthly_metrics(invoices)
+
+        assert list(monthly) == ["2024-01", "2024-02"]
+        assert monthly["2024-01"].total_documents == 2
+        assert monthly["2024-01"].total_value == pytest.approx(250.0)
+        assert monthly["2024-02"].average_value == pytest.approx(50.0)
+
+    def test_vendor_metrics(self):
+        """Test per-vendor rollups including groups without totals."""
+        invoices = [
+            {"vendor_name": "ABC Corp", "total": 300.0},
+            {"vendor_name": "XYZ Inc", "total": None},
+            {"vendor_name": "ABC Corp", "total": 100.0},
+            {"vendor_name": "ABC Corp", "total": 200.0},
+        ]
+
+        vendor_metrics = calculate_vendor_metrics(invoices)
+
+        abc = vendor_metrics["ABC Corp"]
+        assert abc.total_documents == 3
+        assert abc.total_value == pytest.approx(600.0)
+        assert abc.median_value == pytest.approx(200.0)
+        assert (abc.min_value, abc.max_value) == (100.0, 300.0)
+        assert abc.standard_deviation == pytest.approx(100.0)
+
+        xyz = vendor_metrics["XYZ Inc"]
+        assert xyz.total_documents == 1
+        assert xyz.total_value == 0.0
+        assert xyz.median_value is None
+
+    def test_single_invoice_has_no_std(self):
+        """Test that a single total yields no standard deviation."""
+        metrics = calculate_invoice_metrics([{"total": 50.0}])
+
+        assert metrics.median_value == pytest.approx(50.0)
+        assert metrics.standard_deviation is None
+
+    def test_top_categories(self):
+        """Test ranking categories from a breakdown."""
+        invoices = [
+            {"vendor_name": "A", "total": 10.0},
+            {"vendor_name": "B", "total": 30.0},
+            {"vendor_name": "C", "total": 20.0},
+            {"vendor_name": "A", "total": 15.0},
+        ]
+
+        breakdown = calculate_category_breakdown(invoices)
+
+        assert breakdown == {"A": 25.0, "B": 30.0, "C": 20.0}
+        assert top_categories(breakdown, 2) == [("B", 30.0), ("A", 25.0)]
+
+
+class TestAnalystAgent:
+    """Test cases for AnalystAgent."""
+
+    @pytest.fixture
+    def invoices(self):
+        return [
+            {"document_id": "doc-1", "vendor_name": "ABC Corp", "total": 100.0},
+            {"document_id": "doc-2", "vendor_name": "ABC Corp", "total": "300.00"},
+            {"document_id": "doc-3", "vendor_name": "XYZ Inc", "total": 50.0},
+        ]
+
+    def test_analyze_comparison(self, invoices):
+        """Test comparison analysis."""
+        result = AnalystAgent().analyze(invoices, analysis_type="comparison")
+
+        assert result["comparison"]["shared_vendors"] == ["ABC Corp"]
+        assert result["comparison"]["differences"]["total_value"] == pytest.approx(450.0)
+
+    def test_analyze_metrics(self, invoices):
+        """Test metrics analysis."""
+        result = AnalystAgent().analyze(invoices, analysis_type="metrics")
+
+        assert result["overall"]["total_value"] == pytest.approx(450.0)
+        assert result["by_vendor"]["ABC Corp"]["total_documents"] == 2
+        assert result["top_vendor"] == "ABC Corp"
+        assert result["category_breakdown"] == {"ABC Corp": 400.0, "XYZ Inc": 50.0}
+
+    def test_analyze_metrics_overall_only(self, invoices):
+        """Test metrics analysis restricted to the overall section."""
+        result = AnalystAgent().analyze(invoices, analysis_type="metrics", include={"overall"})
+
+        assert list(result) == ["overall"]
+        assert result["overall"]["total_documents"] == 3
+
+    def test_analyze_caches_by_document_set(self, invoices):
+        """Test repeated analysis of the same documents is served from cache."""
+        agent = AnalystAgent()
+
+        first = agent.analyze(invoices, analysis_type="metrics")
+        second = agent.analyze(list(reversed(invoices)), analysis_type="metrics")
+        assert second == first
+        assert second is not first
+
+        first["overall"]["total_documents"] = -1
+        assert agent.analyze(invoices, analysis_type="metrics") == second
+
+    def test_analyze_unknown_type(self, invoices):
+        """Test unknown analysis type returns an error."""
+        result = AnalystAgent().analyze(invoices, analysis_type="bogus")
+
+        assert "error" in result
+
+
+class TestDuplicateCharges:
+    """Test cases for duplicate charge detection."""
+
+    def test_detects_duplicates_with_pipe_in_vendor(self):
+        """Test duplicates are grouped even when the vendor contains a separator."""
+        invoices = [
+            {"document_id": "doc-1", "vendor_name": "A|B Corp", "total": "250.00", "invoice_date": "2024-01-01"},
+            {"document_id": "doc-2", "vendor_name": "A|B Corp", "total": 250, "invoice_date": "2024-01-02"},
+            {"document_id": "doc-3", "vendor_name": "A|B Corp", "total": 99.0, "invoice_date": "2024-01-03"},
+        ]
+
+        anomalies = detect_duplicate_charges(invoices)
+
+        assert len(anomalies) == 1
+        assert anomalies[0].anomaly_type == AnomalyType.DUPLICATE_CHARGE
+        assert anomalies[0].document_ids == ["doc-1", "doc-2"]
+        assert anomalies[0].details == {"vendor": "A|B Corp", "amount": 250.0, "invoice_count": 2}
+
+
+class TestTaxAnomalies:
+    """Test cases for tax anomaly detection."""
+
+    def test_total_and_rate_mismatch(self):
+        """Test both tax anomaly kinds are reported in invoice order."""
+        invoices = [
+            {"document_id": "doc-1", "subtotal": 100.0, "tax": 10.0, "total": 110.0, "tax_rate": 0.1},
+            {"document_id": "doc-2", "subtotal": "100.00", "tax": 10.0, "total": 120.0, "tax_rate": 0.2},
+            {"document_id": "doc-3", "subtotal": 100.0, "tax": None, "total": 120.0},
+        ]
+
+        anomalies = detect_tax_anomalies(invoices)
+
+        assert [a.description for a in anomalies] == [
+            "Tax calculation does not match total",
+            "Tax amount does not match tax rate",
+        ]
+        assert all(a.document_ids == ["doc-2"] for a in anomalies)
+        assert anomalies[0].details["difference"] == pytest.approx(10.0)
+        assert anomalies[1].details["expected_tax"] == pytest.approx(20.0)
@@ -8,6 +8,7 @@ from src.agents.extraction.schemas import (
     get_extraction_schema,
     InvoiceExtraction,
     ContractExtraction,
+    get_field_table,
     validate_extraction_data,
 )
 from src.agents.extraction.validator import ExtractionValidator, validate_extraction
@@ -86,6 +87,17 @@ class TestExtractionValidator:
         assert is_valid is False
         assert len(errors) > 0
 
+    def test_strict_mode_keeps_type_coercion(self):
+        """Test strict mode still coerces types during schema validation."""
+        data = {
+            "invoice_number": "12345",
+            "vendor_name": "ABC Corp",
+            "invoice_date": "2024-01-15",
+        }
+
+        assert ExtractionValidator().validate(data, "invoice")[0] is True
+        assert ExtractionValidator(strict_mode=True).validate(data, "invoice")[0] is True
+
     def test_get_field_completeness(self):
         """Test field completeness calculation."""
         validator = ExtractionValidator()
@@ -99,6 +111,16 @@ class TestExtractionValidator:
         completeness = validator.get_field_completeness(data, "invoice")
         assert 0 < completeness < 1
 
+    def test_validate_field_with_field_table(self):
+        """Test field table entries validate like the Pydantic FieldInfo."""
+        validator = ExtractionValidator()
+        fields = InvoiceExtraction.model_fields
+
+        for entry in get_field_table("invoice"):
+            name = entry[0]
+            assert validator.validate_field(name, None, entry) == \
+                validator.validate_field(name, None, fields[name])
+
     def test_validate_invoice_business_rules(self):
         """Test business rule validation for invoices."""
         validator = ExtractionValidator()
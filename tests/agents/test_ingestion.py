@@ -88,6 +88,90 @@ class TestDocumentClassifier:
         confidence = classifier.get_confidence(invoice_text, DocumentType.INVOICE)
         assert confidence > 0
 
+    def test_confidence_after_classify_matches_fresh_scan(self):
+        """Test confidence reused from classify equals a fresh keyword scan."""
+        text = "Invoice #12345 Bill To: Customer Total Due: $500.00 Dear Sir"
+
+        classifier = DocumentClassifier()
+        classifier.classify(text)
+
+        for doc_type in DocumentType:
+            assert classifier.get_confidence(text, doc_type) == \
+                DocumentClassifier().get_confidence(text, doc_type)
+
+    def test_classify_long_document_reads_head_and_tail(self):
+        """Test long documents are classified from their head and tail."""
+        classifier = DocumentClassifier()
+        filler = "lorem ipsum " * 5000
+
+        assert classifier.classify(filler + "Dear Sir, sincerely yours") == DocumentType.LETTER
+        assert classifier.classify(filler + "Invoice total due" + filler) == DocumentType.OTHER
+
+    def test_batch_classify_matches_classify(self):
+        """Test batch classification agrees with classifying one at a time."""
+        classifier = DocumentClassifier()
+        texts = [
+            "INVOICE #12345 Bill To: Customer Total Due: $500.00",
+            "This Agreement is entered into WHEREAS the parties agree",
+            "MEMO From: John To: Jane Re: update",
+            "Café réunion sans mots-clés",
+            "",
+        ]
+
+        assert classifier.batch_classify(texts) == [classifier.classify(t) for t in texts]
+        assert classifier.batch_classify([]) == []
+
+    def test_batch_classify_then_pooled_parse(self, monkeypatch):
+        """Test process pools still work after the batch kernel has run."""
+        import fitz
+        from src.agents.ingestion import parser as parser_module
+
+        DocumentClassifier().batch_classify(["Invoice total due"])
+
+        pdf = fitz.open()
+        for i in range(4):
+            pdf.new_page().insert_text((72, 72), f"Page {i} text")
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 2)
+
+        result = DocumentParser().parse("test.pdf", pdf.tobytes())
+
+        assert result["page_count"] == 4
+        assert "Page 3 text" in result["text"]
+
+    def test_llm_classification_is_cached(self):
+        """Test repeated LLM classifications of the same sample reuse the answer."""
+
+        class FakeModel:
+            calls = 0
+
+            def generate_content(self, prompt):
+                FakeModel.calls += 1
+                return type("Response", (), {"text": "letter\n"})()
+
+        classifier = DocumentClassifier(gemini_model=FakeModel())
+        text = "Some unremarkable text without keywords"
+
+        assert classifier.classify(text, "a.pdf") == DocumentType.LETTER
+        assert classifier.classify(text, "a.pdf") == DocumentType.LETTER
+        assert FakeModel.calls == 1
+
+    def test_llm_cache_does_not_keep_model_alive(self):
+        """Test the LLM answer cache releases the model with its classifier."""
+        import gc
+        import weakref
+
+        class FakeModel:
+            def generate_content(self, prompt):
+                return type("Response", (), {"text": "memo"})()
+
+        model = FakeModel()
+        model_ref = weakref.ref(model)
+        DocumentClassifier(gemini_model=model).classify("No keywords at all", "a.txt")
+
+        del model
+        gc.collect()
+        assert model_ref() is None
+
 
 class TestDocumentParser:
     """Test cases for DocumentParser."""
@@ -102,6 +186,113 @@ class TestDocumentParser:
         assert "text" in result
         assert "This is a test document" in result["text"]
 
+    def test_parse_text_falls_back_to_latin1(self):
+        """Test non-UTF-8 text files decode as latin-1."""
+        parser = DocumentParser()
+
+        result = parser.parse("test.txt", "Café déjà vu".encode("latin-1") * 1000)
+
+        assert result["text"] == "Café déjà vu" * 1000
+
+    def test_parse_image_reads_header_metadata(self):
+        """Test image metadata is read without decoding the pixels."""
+        import io
+        from unittest.mock import patch
+        from PIL import Image, ImageFile
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (640, 480)).save(buffer, format="PNG")
+
+        with patch.object(ImageFile.ImageFile, "load", side_effect=AssertionError("decoded")):
+            result = DocumentParser().parse("scan.png", buffer.getvalue())
+
+        assert "error" not in result
+        assert result["metadata"] == {"format": "PNG", "mode": "RGB", "width": 640, "height": 480}
+        assert result["images"] == [{"width": 640, "height": 480, "format": "PNG"}]
+
+    def test_parse_pdf_joins_page_text(self):
+        """Test PDF parsing keeps every page's text in order."""
+        import fitz
+
+        pdf = fitz.open()
+        for i in range(3):
+            pdf.new_page().insert_text((72, 72), f"Page {i} text")
+
+        result = DocumentParser().parse("test.pdf", pdf.tobytes())
+
+        assert "error" not in result
+        assert result["page_count"] == 3
+        assert result["text"].index("Page 0") < result["text"].index("Page 1") < result["text"].index("Page 2")
+        assert result["text"].endswith("\n\n")
+
+    def test_parse_pdf_image_metadata(self):
+        """Test PDF image metadata is reported per page."""
+        import fitz
+
+        pdf = fitz.open()
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 12, 8), False)
+        pdf.new_page().insert_image(fitz.Rect(0, 0, 120, 80), pixmap=pixmap)
+
+        images = DocumentParser().parse("test.pdf", pdf.tobytes())["images"]
+
+        assert len(images) == 1
+        assert images[0]["page"] == 0
+        assert (images[0]["width"], images[0]["height"]) == (12, 8)
+        assert images[0]["colorspace"] == 3
+
+    def test_parse_pdf_parallel_matches_sequential(self, monkeypatch):
+        """Test multi-process page extraction returns the sequential result."""
+        import fitz
+        from src.agents.ingestion import parser as parser_module
+
+        pdf = fitz.open()
+        for i in range(6):
+            pdf.new_page().insert_text((72, 72), f"Page {i} text")
+        pdf_bytes = pdf.tobytes()
+
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 2)
+        parallel = DocumentParser().parse("test.pdf", pdf_bytes)
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 100)
+
+        assert parallel == DocumentParser().parse("test.pdf", pdf_bytes)
+
+    def test_parse_pdf_falls_back_when_pool_breaks(self, monkeypatch):
+        """Test a broken PDF pool falls back to in-process page extraction."""
+        import fitz
+        from concurrent.futures.process import BrokenProcessPool
+        from src.agents.ingestion import parser as parser_module
+
+        def broken_run(fn, calls):
+            raise BrokenProcessPool("worker died")
+
+        pdf = fitz.open()
+        for i in range(4):
+            pdf.new_page().insert_text((72, 72), f"Page {i} text")
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 2)
+        monkeypatch.setattr(parser_module._PDF_POOL, "run", broken_run)
+
+        result = DocumentParser().parse("test.pdf", pdf.tobytes())
+
+        assert "error" not in result
+        assert "Page 3 text" in result["text"]
+
+    def test_extract_pdf_text_parallel_matches_sequential(self, monkeypatch):
+        """Test pooled PDF text extraction returns the in-process text."""
+        import fitz
+        from src.agents.ingestion import parser as parser_module
+
+        pdf = fitz.open()
+        for i in range(6):
+            pdf.new_page().insert_text((72, 72), f"Page {i} text")
+        pdf_bytes = pdf.tobytes()
+
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 2)
+        parallel = parser_module.extract_pdf_text(pdf_bytes)
+        monkeypatch.setattr(parser_module, "_PARALLEL_MIN_PAGES", 100)
+
+        assert parallel == parser_module.extract_pdf_text(pdf_bytes)
+        assert parallel.index("Page 0") < parallel.index("Page 5")
+
     def test_get_extension(self):
         """Test file extension extraction."""
         parser = DocumentParser()
@@ -109,6 +300,8 @@ class TestDocumentParser:
         assert parser._get_extension("document.pdf") == ".pdf"
         assert parser._get_extension("image.jpg") == ".jpg"
         assert parser._get_extension("doc.PNG") == ".png"
+        assert parser._get_extension("v1.2/README") == ""
+        assert parser._get_extension(".bashrc") == ""
 
 
 class TestTextChunker:
@@ -134,6 +327,28 @@ class TestTextChunker:
         assert "metadata" in chunks[0]
         assert chunks[0]["metadata"]["doc_id"] == "test"
 
+    def test_iter_chunks_matches_chunk_text(self):
+        """Test the lazy chunk iterator yields the same chunks."""
+        chunker = TextChunker(chunk_size=100, chunk_overlap=20)
+
+        text = "First sentence here. Second one follows! " * 20
+        chunks = chunker.iter_chunks(text, metadata={"doc_id": "test"})
+
+        assert not isinstance(chunks, list)
+        assert list(chunks) == chunker.chunk_text(text, metadata={"doc_id": "test"})
+
+    def test_large_text_kernel_matches_regex_path(self, monkeypatch):
+        """Test the compiled boundary scan chunks large text like the regex path."""
+        from src.agents.ingestion import chunker as chunker_module
+
+        chunker = TextChunker(chunk_size=200, chunk_overlap=30)
+        text = "Première phrase ici. Deuxième suit!　Troisième? Oui. " * 2000
+
+        kernel_chunks = chunker.chunk_text(text)
+        monkeypatch.setattr(chunker_module, "_KERNEL_MIN_CHARS", len(text) + 1)
+
+        assert kernel_chunks == chunker.chunk_text(text)
+
     def test_chunk_by_paragraphs(self):
         """Test paragraph-based chunking."""
         chunker = TextChunker(chunk_size=50, chunk_overlap=10)
@@ -178,3 +393,24 @@ class TestIngestionAgent:
 
         assert agent.validate_state(valid_state) is True
         assert agent.validate_state(invalid_state) is False
+
+    def test_chunk_text_large_document_uses_pool(self):
+        """Test large documents chunk the same in the process pool."""
+        agent = IngestionAgent()
+        text = "Hello there. General Kenobi! " * 5000
+
+        assert agent._chunk_text(text) == [c["text"] for c in agent.chunker.chunk_text(text)]
+
+    def test_chunk_text_falls_back_when_pool_breaks(self, monkeypatch):
+        """Test a broken chunking pool falls back to in-process chunking."""
+        from concurrent.futures.process import BrokenProcessPool
+        from src.agents.ingestion import agent as agent_module
+
+        def broken_run(fn, calls):
+            raise BrokenProcessPool("worker died")
+
+        monkeypatch.setattr(agent_module._CHUNK_POOL, "run", broken_run)
+        agent = IngestionAgent()
+        text = "Hello there. General Kenobi! " * 5000
+
+        assert agent._chunk_text(text) == [c["text"] for c in agent.chunker.chunk_text(text)]
@@ -154,3 +154,18 @@ class TestSupervisorState:
         }
 
         assert check_approval_required(state) is True
+
+    def test_check_approval_required_high_value(self):
+        """Test approval check for high-value extractions."""
+        from src.agents.supervisor.state import check_approval_required
+
+        state = {
+            "extraction_results": {
+                "doc-001": {"confidence": 0.9, "data": {"total": 50.0}},
+                "doc-002": {"confidence": 0.9, "data": {"amount": 5000.0}},
+            },
+            "analysis_results": {"anomalies": []},
+        }
+
+        assert check_approval_required(state, value_threshold=1000.0) is True
+        assert check_approval_required(state, value_threshold=10000.0) is False